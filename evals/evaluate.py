@@ -12,27 +12,34 @@ from src.chatbot import Chatbot
 # ---------------------------------------------------------------------
 
 
-# Load the Excel file
-df = pd.read_excel("evaluation_triplets.xlsx")
+def main():
+    # Load the Excel file
+    df = pd.read_excel("evaluation_triplets.xlsx")
 
-# Initialize the chatbot
-chatbot = Chatbot()
+    # Initialize the chatbot
+    chatbot = Chatbot()
 
-# Iterate through each question in the DataFrame
-for index, row in df.iterrows():
-    question = row["Question"]  # Adjust the column name if necessary
-    context = row["Context"]  # Adjust the column name if necessary
+    # Iterate through each question in the DataFrame
+    for index, row in df.iterrows():
+        question = row["Question"]  # Adjust the column name if necessary
+        context = row["Context"]  # Adjust the column name if necessary
 
-    # Get the response and context from the chatbot
-    response_n_context = chatbot.respond_w_context(question)
+        # Get the response and context from the chatbot
+        response_n_context = chatbot.respond_w_context(question)
 
-    # Parse the response and context
-    response, context = response_n_context.split("\n\nCONTEXT: ")
-    response = response.replace("RESPONSE: ", "")
+        # Parse the response and context
+        response, context = response_n_context.split("\n\nCONTEXT: ")
+        response = response.replace("RESPONSE: ", "")
 
-    # Append the response and context to the DataFrame
-    df.at[index, "Answer"] = response
-    df.at[index, "Chatbot Context"] = context
+        # Append the response and context to the DataFrame
+        df.at[index, "Answer"] = response
+        df.at[index, "Chatbot Context"] = context
 
-# Save the updated DataFrame to a new Excel file
-df.to_excel("updated_responses.xlsx", index=False)
+    # Save the updated DataFrame to a new Excel file
+    df.to_excel("updated_responses.xlsx", index=False)
+
+
+# Ingestion starts worker processes that re-import the main module; only run
+# the evaluation from the original process
+if __name__ == "__main__":
+    main()
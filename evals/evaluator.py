@@ -1,9 +1,20 @@
 import os
 import json
+import multiprocessing
+import shelve
+import asyncio
+import hashlib
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 import pandas as pd
+import xlsxwriter
 from tqdm import tqdm
 import fitz  # PyMuPDF for handling PDF files
-from openai import OpenAI
+from openai import (
+    AsyncOpenAI,
+    APIConnectionError,
+    InternalServerError,
+    RateLimitError,
+)
 from tenacity import (
     retry,
     stop_after_attempt,
@@ -11,6 +22,7 @@ from tenacity import (
     retry_if_exception_type,
 )
 from dotenv import load_dotenv
+from evals.rate_limiter import RateLimitedClient
 
 # ------------------------------------------------------------
 # Evaluator Class; used to evaluate the chatbot responses
@@ -21,6 +33,25 @@ from dotenv import load_dotenv
 # Load environment variables
 load_dotenv()
 
+# Model used to generate the context-question-answer triplets
+MODEL = "gpt-4o"
+
+# Bump whenever the prompts change so cached responses are invalidated
+PROMPT_VERSION = 2
+
+# Malformed answers: a truncated response, or a pack with the wrong number of
+# items. A pack that keeps getting them is split, and a single input dropped
+MALFORMED_ERRORS = (json.JSONDecodeError, ValueError)
+
+# Transient API errors and malformed answers are worth retrying; anything else
+# is a bug and fails fast. API errors that outlast the retries abort the run
+RETRYABLE_ERRORS = (
+    RateLimitError,
+    APIConnectionError,
+    InternalServerError,
+    *MALFORMED_ERRORS,
+)
+
 # JSON Schemas for expected responses
 JSON_SCHEMAS = {
     "context_question_answer": {
@@ -31,6 +62,7 @@ JSON_SCHEMAS = {
             "answer": {"type": "string"},
         },
         "required": ["context", "question", "answer"],
+        "additionalProperties": False,
     },
     "evaluation_response": {
         "type": "object",
@@ -39,183 +71,547 @@ JSON_SCHEMAS = {
             "is_correct": {"type": "integer", "enum": [-1, 0, 1]},
         },
         "required": ["has_context", "is_correct"],
+        "additionalProperties": False,
     },
 }
 
+# Columns of the detailed evaluation sheet
+DETAILED_COLUMNS = [
+    "GPT Context",
+    "GPT Question",
+    "GPT Answer",
+    "Chatbot Response",
+    "Has Context",
+    "Is Correct",
+]
+
+# Pages handed to each PDF extraction task
+PAGES_PER_TASK = 16
+
+# Plain-text extraction without ligature preservation, joining hyphenated line
+# breaks and clipping to the page; images are never requested
+TEXT_FLAGS = (
+    fitz.TEXT_PRESERVE_WHITESPACE | fitz.TEXT_MEDIABOX_CLIP | fitz.TEXT_DEHYPHENATE
+)
+
+# Marks the end of a lazily consumed input iterator
+_END = object()
+
+# Context window and output limit of MODEL, and completion budget per packed
+# triplet (each one quotes its relevant context)
+MODEL_CONTEXT_TOKENS = 128000
+MODEL_MAX_OUTPUT_TOKENS = 16384
+CQA_TOKENS_PER_ITEM = 1536
+
+# Room left for the system prompt and the INPUT[i] markers of a request
+PROMPT_OVERHEAD_TOKENS = 1024
+
+# Pages with less text than this cannot produce a meaningful question
+MIN_PAGE_CHARS = 100
+
+
+def _page_text(doc, page_number):
+    # A damaged page is skipped; anything else (including failing to open the
+    # document) propagates so the run aborts before spending API budget
+    try:
+        return doc[page_number].get_text("text", flags=TEXT_FLAGS)
+    except fitz.mupdf.FzErrorBase as e:
+        print(f"Skipping page {page_number + 1}: {e}")
+        return None
+
+
+def _extract_pages(pdf_path, start, end):
+    # fitz.Document cannot be shared across processes; each task opens its own
+    with fitz.open(pdf_path) as doc:
+        pages = (_page_text(doc, i) for i in range(start, end))
+        return [page for page in pages if page is not None]
+
 
 class Evaluator:
-    def __init__(self, pdf_path=None, num_pages=None, chatbot=None):
+    def __init__(
+        self,
+        pdf_path=None,
+        num_pages=None,
+        chatbot=None,
+        max_concurrency=20,
+        requests_per_minute=500,
+        tokens_per_minute=30000,
+        batch_poll_interval=60,
+        items_per_request=8,
+        cache_path=".alba_cache.db",
+        eval_model="gpt-4o-mini",
+    ):
         self.pdf_path = pdf_path
         self.num_pages = num_pages
-        self.client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+        self.client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+        # Throttles chat completions to the account RPM/TPM limits; the limits
+        # are retuned from the x-ratelimit-* headers of every response
+        self.limited_client = RateLimitedClient(
+            self.client,
+            max_concurrency=max_concurrency,
+            requests_per_minute=requests_per_minute,
+            tokens_per_minute=tokens_per_minute,
+        )
+        # Loaded once; used to size pages before they are sent to the model
+        self.encoding = self.limited_client.encoding_for(MODEL)
         self.chatbot = chatbot
+        # Seconds between status checks of a submitted Batch API job
+        self.batch_poll_interval = batch_poll_interval
+        # Number of pages (or triplets to score) packed into a single request
+        self.items_per_request = items_per_request
+        # Responses are cached by input hash so re-runs skip identical LLM calls
+        self.cache_path = cache_path
+        # Scoring is a small classification task; a cheaper model is enough
+        self.eval_model = eval_model
 
-    def read_pdf(self):
-        pages = []
-        try:
-            with fitz.open(self.pdf_path) as doc:
-                for page in doc:
-                    if self.num_pages and len(pages) >= self.num_pages:
-                        break
-                    pages.append(page.get_text())
-        except Exception as e:
-            print(f"Failed to read PDF: {e}")
-        return pages
+    def iter_pages(self):
+        with fitz.open(self.pdf_path) as doc:
+            num_pages = len(doc)
+        if self.num_pages:
+            num_pages = min(num_pages, self.num_pages)
 
-    @retry(
-        retry=retry_if_exception_type(Exception),
-        stop=stop_after_attempt(5),
-        wait=wait_random_exponential(multiplier=1, max=60),
-    )
-    def generate_context_question_answer(self, page_text):
-        json_schema_str = json.dumps(JSON_SCHEMAS["context_question_answer"])
+        starts = range(0, num_pages, PAGES_PER_TASK)
+        ends = [min(start + PAGES_PER_TASK, num_pages) for start in starts]
+        if len(starts) <= 1:
+            yield from _extract_pages(self.pdf_path, 0, num_pages)
+            return
+
+        # Text extraction is CPU-bound; spread page ranges across processes.
+        # map yields ranges in order as they finish, so pages stream out
+        # long before the whole document has been read. Workers are spawned:
+        # this runs on a reader thread while the event loop and the HTTP
+        # client are live, which a fork would copy mid-flight
+        max_workers = min(len(starts), os.cpu_count() or 1)
+        with ProcessPoolExecutor(
+            max_workers=max_workers, mp_context=multiprocessing.get_context("spawn")
+        ) as executor:
+            for chunk in executor.map(
+                _extract_pages, [self.pdf_path] * len(starts), starts, ends
+            ):
+                yield from chunk
+
+    def _pack(self, items):
+        # Several inputs share one request (and one system prompt), cutting the
+        # request count by a factor of items_per_request
+        k = self.items_per_request
+        return [items[i : i + k] for i in range(0, len(items), k)]
+
+    def _packed_user_message(self, inputs):
+        return "\n\n".join(f"INPUT[{i}]: {text}" for i, text in enumerate(inputs))
+
+    def _seed(self, user_content):
+        # Stable across processes (unlike hash()), so a retried request is
+        # sampled with the same seed as the original attempt
+        return int(hashlib.sha256(user_content.encode("utf-8")).hexdigest()[:8], 16)
+
+    def _parse_items(self, content, expected, finish_reason=None):
+        # A response cut off at max_tokens is never valid JSON; fail with a clear
+        # (retryable) error instead of a decode error
+        if finish_reason == "length":
+            raise ValueError("Response truncated at max_tokens")
+        items = json.loads(content)["items"]
+        if len(items) != expected:
+            raise ValueError(f"Expected {expected} items in response, got {len(items)}")
+        return items
+
+    def _cache_key(self, kind, model, item):
+        # Model, prompt version and schemas are part of the key, so changing
+        # any of them invalidates the cached entries
+        key_material = json.dumps(
+            [kind, model, PROMPT_VERSION, JSON_SCHEMAS, item],
+            sort_keys=True,
+            ensure_ascii=False,
+        )
+        return hashlib.sha256(key_material.encode("utf-8")).hexdigest()
+
+    async def _fan_out(
+        self,
+        kind,
+        model,
+        inputs,
+        build_request,
+        send_pack,
+        use_batch_api,
+        desc,
+        on_result=None,
+    ):
+        # Results are returned in input order, or handed to on_result(item, result)
+        # as they arrive so the caller can stream them instead of holding them.
+        # Inputs dropped after repeated malformed answers are returned alongside
+        loop = asyncio.get_running_loop()
+        results, misses, tasks, skipped = [], [], [], []
+        num_items = 0
+
+        # The bar counts items rather than requests; lazy inputs have no len(),
+        # so their total grows as items are read
+        total = len(inputs) if hasattr(inputs, "__len__") else None
+
+        with (
+            shelve.open(self.cache_path) as cache,
+            ThreadPoolExecutor(max_workers=1) as reader,
+            tqdm(total=total, desc=desc) as progress,
+        ):
+
+            def _emit(i, item, result):
+                if on_result is None:
+                    results[i] = result
+                else:
+                    on_result(item, result)
+                progress.update()
+
+            def _store(pack, pack_results):
+                for (i, key, item), result in zip(pack, pack_results):
+                    cache[key] = result
+                    _emit(i, item, result)
+
+            async def _send(pack):
+                # Store as each request completes so a failed run keeps its progress
+                try:
+                    pack_results = await send_pack([item for _, _, item in pack])
+                except MALFORMED_ERRORS as e:
+                    if len(pack) == 1:
+                        # Left out of the results and the cache; a re-run retries it
+                        print(
+                            f"Skipping input {pack[0][0]} after repeated failures: {e}"
+                        )
+                        skipped.append(pack[0][2])
+                        progress.update()
+                        return
+                    # Packs the model keeps answering wrongly are re-sent in halves
+                    half = len(pack) // 2
+                    await asyncio.gather(_send(pack[:half]), _send(pack[half:]))
+                    return
+                _store(pack, pack_results)
+
+            # Inputs may be a lazy page generator: pull them on a single reader
+            # thread so extraction overlaps with the requests already in flight
+            inputs = iter(inputs)
+            while (
+                item := await loop.run_in_executor(reader, next, inputs, _END)
+            ) is not _END:
+                i = num_items
+                num_items += 1
+                key = self._cache_key(kind, model, item)
+                if on_result is None:
+                    results.append(None)
+                if total is None:
+                    progress.total = num_items
+                    progress.refresh()
+
+                # Only inputs missing from the cache are sent to the model
+                cached = cache.get(key)
+                if cached is not None:
+                    _emit(i, item, cached)
+                else:
+                    misses.append((i, key, item))
+                    if len(misses) == self.items_per_request and not use_batch_api:
+                        tasks.append(asyncio.create_task(_send(misses)))
+                        misses = []
+
+            if use_batch_api:
+                packs = self._pack(misses)
+                contents = await self._submit_batch(
+                    [build_request([item for _, _, item in pack]) for pack in packs]
+                )
+                # Successful packs are cached right away; failed or malformed ones
+                # go through the synchronous path, with its retries and splits
+                for content, pack in zip(contents, packs):
+                    try:
+                        if content is None:
+                            raise ValueError("Batch request failed")
+                        _store(pack, self._parse_items(content, len(pack)))
+                    except ValueError:
+                        tasks.append(asyncio.create_task(_send(pack)))
+            elif misses:
+                tasks.append(asyncio.create_task(_send(misses)))
+
+            # Let every pack finish (and be cached) before surfacing an error
+            outcomes = await asyncio.gather(*tasks, return_exceptions=True)
+            errors = [o for o in outcomes if isinstance(o, BaseException)]
+            if errors:
+                raise errors[0]
+
+        if skipped:
+            print(f"Skipped {len(skipped)} of {num_items} inputs in {desc}")
+        # Skipped inputs have no result
+        return [result for result in results if result is not None], skipped
+
+    def _response_format(self, kind):
+        # Structured outputs: the model is constrained to the schema, so the
+        # response always parses and needs no format instructions in the prompt
+        return {
+            "type": "json_schema",
+            "json_schema": {
+                "name": kind,
+                "strict": True,
+                "schema": {
+                    "type": "object",
+                    "properties": {
+                        "items": {"type": "array", "items": JSON_SCHEMAS[kind]}
+                    },
+                    "required": ["items"],
+                    "additionalProperties": False,
+                },
+            },
+        }
+
+    def _cqa_max_tokens(self, num_pages):
+        # Every packed page gets its own triplet budget, up to the output limit
+        return min(MODEL_MAX_OUTPUT_TOKENS, CQA_TOKENS_PER_ITEM * num_pages)
+
+    def _cqa_request(self, pages):
         system_message = (
-            "You are a helpful assistant. Your task is to read a text and create a JSON structure with: "
+            "You are a helpful assistant. You will receive several texts, each prefixed with INPUT[i]. "
+            "For each text, create a JSON structure with: "
             "1. A self-contained question in Spanish that can be answered by the text, "
             "2. The answer in Spanish, "
             "3. The relevant context from the text. "
-            "Ensure the output is in JSON format and matches this schema: "
-            + json_schema_str
+            f"Return exactly {len(pages)} items, one per INPUT[i] and in the same order."
         )
         messages = [
             {"role": "system", "content": system_message},
-            {"role": "user", "content": page_text},
+            {"role": "user", "content": self._packed_user_message(pages)},
         ]
-        response = self.client.chat.completions.create(
-            model="gpt-4o",
-            messages=messages,
-            max_tokens=4096,
-            temperature=0,
-        )
-        c_q_a_triplet = response.choices[0].message.content
-        return c_q_a_triplet
-
-    def get_responses(self, c_q_a_triplets):
-        responses = []
-        for triplet in tqdm(c_q_a_triplets, desc="Getting Chatbot Responses"):
-            if isinstance(triplet, str):
-                triplet = json.loads(triplet)  # Convert string to JSON (dictionary)
-
-            question = triplet.get("question")
-            response = self.chatbot.respond_w_context(question)
-            responses.append(response)
-        return responses
+        return {
+            "model": MODEL,
+            "messages": messages,
+            "max_tokens": self._cqa_max_tokens(len(pages)),
+            "temperature": 0,
+            "seed": self._seed(messages[1]["content"]),
+            "response_format": self._response_format("context_question_answer"),
+        }
 
     @retry(
-        retry=retry_if_exception_type(Exception),
+        retry=retry_if_exception_type(RETRYABLE_ERRORS),
         stop=stop_after_attempt(5),
         wait=wait_random_exponential(multiplier=1, max=60),
+        reraise=True,
     )
-    def evaluate_responses(self, c_q_a_triplets, chatbot_responses):
-        results = []
-        for triplet, chatbot_response in tqdm(
-            zip(c_q_a_triplets, chatbot_responses), desc="Evaluating Responses"
-        ):
-            if isinstance(triplet, str):
-                triplet = json.loads(triplet)
-            gpt_context = triplet["context"]
-            gpt_question = triplet["question"]
-            gpt_answer = triplet["answer"]
+    async def generate_context_question_answer(self, pages):
+        response = await self.limited_client.create(**self._cqa_request(pages))
+        choice = response.choices[0]
+        return self._parse_items(
+            choice.message.content, len(pages), choice.finish_reason
+        )
 
-            json_schema_str = json.dumps(JSON_SCHEMAS["evaluation_response"])
-            system_message = (
-                "You are an evaluator tasked with assessing the chatbot's responses based on the GPT model's output. Please score the responses as follows: "
-                "'has_context': Assign a score of 1 if the chatbot's context accurately reflects the necessary information to understand the question, otherwise assign a score of 0. "
-                "'is_correct': Assign a score of 1 if both the context and the answer are correct; assign a score of -1 if the context is correct but the answer is incorrect; assign a score of 0 if the context does not adequately support the question. "
-                "Ensure your evaluation matches the following JSON schema: "
-                + json_schema_str
-            )
-            messages = [
-                {"role": "system", "content": system_message},
-                {
-                    "role": "user",
-                    "content": f"Question: {gpt_question}, GPT Context: {gpt_context}, GPT Answer: {gpt_answer}, Chatbot Response: {chatbot_response}",
-                },
-            ]
-            eval_response = self.client.chat.completions.create(
-                model="gpt-4o",
-                messages=messages,
-                max_tokens=1024,
-                temperature=0,
+    def _split_page(self, page):
+        # A full pack of items_per_request pages must fit in the context window;
+        # longer pages are split here instead of being rejected by the API
+        max_page_tokens = (
+            MODEL_CONTEXT_TOKENS
+            - self._cqa_max_tokens(self.items_per_request)
+            - PROMPT_OVERHEAD_TOKENS
+        ) // self.items_per_request
+        tokens = self.encoding.encode(page)
+        if len(tokens) <= max_page_tokens:
+            yield page
+            return
+        for start in range(0, len(tokens), max_page_tokens):
+            yield self.encoding.decode(tokens[start : start + max_page_tokens])
+
+    async def _generate_triplets(self, pages, use_batch_api=False):
+        return await self._fan_out(
+            "context_question_answer",
+            MODEL,
+            (
+                piece
+                for page in pages
+                if len(page.strip()) >= MIN_PAGE_CHARS
+                for piece in self._split_page(page)
+            ),
+            self._cqa_request,
+            self.generate_context_question_answer,
+            use_batch_api,
+            desc="Generating C-Q-A Triplets",
+        )
+
+    def get_responses(self, c_q_a_triplets, max_workers=16):
+        def _respond(triplet):
+            return self.chatbot.respond_w_context(triplet.get("question"))
+
+        # Each response is dominated by retrieval and LLM I/O; overlap them in threads
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(
+                tqdm(
+                    executor.map(_respond, c_q_a_triplets),
+                    total=len(c_q_a_triplets),
+                    desc="Getting Chatbot Responses",
+                )
             )
-            result = eval_response.choices[0].message.content
-            results.append(result)
-        return results
 
-    def save_scores(
+    async def evaluate_responses(
         self,
-        response_scores,
         c_q_a_triplets,
         chatbot_responses,
+        use_batch_api=False,
         file_path="evaluation_summary.xlsx",
+        skipped_inputs=0,
     ):
-        if all(isinstance(result, str) for result in response_scores):
-            response_scores = [json.loads(result) for result in response_scores]
-
-        data = []
-        for triplet, response, eval_result in zip(
-            c_q_a_triplets, chatbot_responses, response_scores
-        ):
-            if isinstance(triplet, str):
-                triplet = json.loads(triplet)
-            if isinstance(eval_result, str):
-                eval_result = json.loads(eval_result)
+        # Rows are streamed to disk as evaluations complete (in completion order),
+        # so no list of results is kept; the summary comes from running totals.
+        # NaN cells (should any reach the sheet) are written as #NUM! errors
+        # instead of aborting the run
+        workbook = xlsxwriter.Workbook(
+            file_path, {"constant_memory": True, "nan_inf_to_errors": True}
+        )
+        details = workbook.add_worksheet("Detailed Responses")
+        details.write_row(0, 0, DETAILED_COLUMNS)
+        # skipped_inputs counts pages that never became triplets
+        totals = {
+            "responses": 0,
+            "has_context": 0,
+            "correct": 0,
+            "skipped": skipped_inputs,
+        }
+        num_rows = 0
 
-            data.append(
+        def _write_row(pair, eval_result):
+            # eval_result is None for inputs that could not be evaluated; they
+            # are listed with blank scores
+            nonlocal num_rows
+            triplet, chatbot_response = pair
+            scores = []
+            if eval_result is not None:
+                totals["responses"] += 1
+                totals["has_context"] += eval_result["has_context"]
+                totals["correct"] += eval_result["is_correct"] == 1
+                scores = [eval_result["has_context"], eval_result["is_correct"]]
+            num_rows += 1
+            details.write_row(
+                num_rows,
+                0,
                 [
                     triplet["context"],
                     triplet["question"],
                     triplet["answer"],
-                    response,
-                    eval_result["has_context"],
-                    eval_result["is_correct"],
-                ]
+                    chatbot_response,
+                    *scores,
+                ],
             )
 
-        df = pd.DataFrame(
-            data,
-            columns=[
-                "GPT Context",
-                "GPT Question",
-                "GPT Answer",
-                "Chatbot Response",
-                "Has Context",
-                "Is Correct",
-            ],
+        try:
+            _, skipped = await self._fan_out(
+                "evaluation_response",
+                self.eval_model,
+                list(zip(c_q_a_triplets, chatbot_responses)),
+                self._evaluation_request,
+                self._evaluate_pack,
+                use_batch_api,
+                desc="Evaluating Responses",
+                on_result=_write_row,
+            )
+            totals["skipped"] += len(skipped)
+            for pair in skipped:
+                _write_row(pair, None)
+
+            summary = self._summarize_scores(**totals)
+            summary_sheet = workbook.add_worksheet("Summary")
+            summary_sheet.write_row(0, 0, list(summary))
+            summary_sheet.write_row(1, 0, list(summary.values()))
+        finally:
+            workbook.close()
+
+        return summary
+
+    def _evaluation_request(self, pack):
+        inputs = []
+        for triplet, chatbot_response in pack:
+            gpt_context = triplet["context"]
+            gpt_question = triplet["question"]
+            gpt_answer = triplet["answer"]
+            inputs.append(
+                f"Question: {gpt_question}, GPT Context: {gpt_context}, GPT Answer: {gpt_answer}, Chatbot Response: {chatbot_response}"
+            )
+
+        system_message = (
+            "You are an evaluator tasked with assessing the chatbot's responses based on the GPT model's output. "
+            "You will receive several cases, each prefixed with INPUT[i]. Please score each case as follows: "
+            "'has_context': Assign a score of 1 if the chatbot's context accurately reflects the necessary information to understand the question, otherwise assign a score of 0. "
+            "'is_correct': Assign a score of 1 if both the context and the answer are correct; assign a score of -1 if the context is correct but the answer is incorrect; assign a score of 0 if the context does not adequately support the question. "
+            f"Return exactly {len(pack)} evaluations, one per INPUT[i] and in the same order."
         )
+        messages = [
+            {"role": "system", "content": system_message},
+            {"role": "user", "content": self._packed_user_message(inputs)},
+        ]
+        return {
+            "model": self.eval_model,
+            "messages": messages,
+            "max_tokens": 1024,
+            "temperature": 0,
+            "seed": self._seed(messages[1]["content"]),
+            "response_format": self._response_format("evaluation_response"),
+        }
 
-        total_responses = len(response_scores)
-        total_has_context = sum(row[4] for row in data)
-        total_correct = sum(row[5] == 1 for row in data)
-        percent_has_context = (
-            (total_has_context / total_responses * 100) if total_responses else 0
+    @retry(
+        retry=retry_if_exception_type(RETRYABLE_ERRORS),
+        stop=stop_after_attempt(5),
+        wait=wait_random_exponential(multiplier=1, max=60),
+        reraise=True,
+    )
+    async def _evaluate_pack(self, pack):
+        eval_response = await self.limited_client.create(
+            **self._evaluation_request(pack)
         )
-        percent_correct = (
-            (total_correct / total_has_context * 100) if total_has_context else 0
+        choice = eval_response.choices[0]
+        return self._parse_items(
+            choice.message.content, len(pack), choice.finish_reason
         )
 
-        summary_df = pd.DataFrame(
-            [
-                [
-                    total_responses,
-                    total_has_context,
-                    f"{percent_has_context:.2f}%",
-                    total_correct,
-                    f"{percent_correct:.2f}%",
-                ]
-            ],
-            columns=[
-                "Total Responses",
-                "Total Has Context",
-                "Percentage Has Context",
-                "Total Correct",
-                "Percentage Correct",
-            ],
+    async def _submit_batch(self, request_bodies, endpoint="/v1/chat/completions"):
+        # Batch API: half the price of synchronous calls and no RPM limits,
+        # in exchange for results arriving within the 24h completion window
+        if not request_bodies:
+            return []
+        lines = [
+            json.dumps(
+                {"custom_id": str(i), "method": "POST", "url": endpoint, "body": body}
+            )
+            for i, body in enumerate(request_bodies)
+        ]
+        batch_file = await self.client.files.create(
+            file=("requests.jsonl", "\n".join(lines).encode("utf-8")),
+            purpose="batch",
+        )
+        batch = await self.client.batches.create(
+            input_file_id=batch_file.id,
+            endpoint=endpoint,
+            completion_window="24h",
         )
 
-        with pd.ExcelWriter(file_path, engine="openpyxl") as writer:
-            df.to_excel(writer, sheet_name="Detailed Responses", index=False)
-            summary_df.to_excel(writer, sheet_name="Summary", index=False)
+        while batch.status not in ("completed", "failed", "expired", "cancelled"):
+            await asyncio.sleep(self.batch_poll_interval)
+            batch = await self.client.batches.retrieve(batch.id)
+        if batch.status != "completed":
+            print(f"Batch {batch.id} finished with status {batch.status}")
+
+        # Output lines are not guaranteed to follow input order; map by custom_id.
+        # Expired and cancelled batches still have an output file with the
+        # requests that did finish; failed or truncated requests are left as None
+        contents = [None] * len(request_bodies)
+        if batch.output_file_id:
+            output = await self.client.files.content(batch.output_file_id)
+            for line in output.text.splitlines():
+                result = json.loads(line)
+                if result["response"] and result["response"]["status_code"] == 200:
+                    choice = result["response"]["body"]["choices"][0]
+                    if choice["finish_reason"] != "length":
+                        contents[int(result["custom_id"])] = choice["message"][
+                            "content"
+                        ]
+        return contents
+
+    def _summarize_scores(self, responses, has_context, correct, skipped=0):
+        percent_has_context = (has_context / responses * 100) if responses else 0
+        percent_correct = (correct / has_context * 100) if has_context else 0
+        return {
+            "Total Responses": responses,
+            "Total Has Context": has_context,
+            "Percentage Has Context": f"{percent_has_context:.2f}%",
+            "Total Correct": correct,
+            "Percentage Correct": f"{percent_correct:.2f}%",
+            "Total Skipped": skipped,
+        }
 
     def save_triplets(self, c_q_a_triplets, file_path="triplets.xlsx"):
         contexts = []
@@ -223,9 +619,6 @@ class Evaluator:
         answers = []
 
         for triplet in c_q_a_triplets:
-            if isinstance(triplet, str):
-                triplet = json.loads(triplet)
-
             contexts.append(triplet.get("context", ""))
             questions.append(triplet.get("question", ""))
             answers.append(triplet.get("answer", ""))
@@ -234,44 +627,62 @@ class Evaluator:
             {"Context": contexts, "Question": questions, "Answer": answers}
         )
 
-        df.to_excel(file_path, index=False)
+        df.to_excel(file_path, index=False, engine="xlsxwriter")
 
     def load_triplets(self, file_path="triplets.xlsx"):
-        df_triplets = pd.read_excel(file_path)
-        c_q_a_triplets = []
-        for _, row in df_triplets.iterrows():
-            c_q_a_triplets.append(
-                {
-                    "context": row["Context"],
-                    "question": row["Question"],
-                    "answer": row["Answer"],
-                }
-            )
-        return c_q_a_triplets
+        df_triplets = pd.read_excel(file_path).rename(
+            columns={"Context": "context", "Question": "question", "Answer": "answer"}
+        )
+        # Empty cells are read back as NaN; restore the empty strings that were saved
+        return (
+            df_triplets[["context", "question", "answer"]]
+            .fillna("")
+            .to_dict(orient="records")
+        )
 
-    def evaluate_existing_triplets(self, triplets_file_path="triplets.xlsx"):
+    def evaluate_existing_triplets(
+        self, triplets_file_path="triplets.xlsx", use_batch_api=False
+    ):
         c_q_a_triplets = self.load_triplets(triplets_file_path)
-        chatbot_responses = self.get_responses(c_q_a_triplets)
-        response_scores = self.evaluate_responses(c_q_a_triplets, chatbot_responses)
-        self.save_scores(response_scores, c_q_a_triplets, chatbot_responses)
-        return response_scores
+        return asyncio.run(self._evaluate_triplets(c_q_a_triplets, use_batch_api))
 
-    def run_evaluation(
-        self, use_existing_triplets=False, triplets_file_path="triplets.xlsx"
+    async def _evaluate_triplets(
+        self, c_q_a_triplets, use_batch_api=False, skipped_inputs=0
     ):
-        if use_existing_triplets and os.path.exists(triplets_file_path):
-            return self.evaluate_existing_triplets(triplets_file_path)
-        else:
-            pages = self.read_pdf()
-            c_q_a_triplets = []
-            for page in tqdm(pages, desc="Generating C-Q-A Triplets"):
-                if page.strip():
-                    triplet = self.generate_context_question_answer(page)
-                    c_q_a_triplets.append(triplet)
+        # The chatbot is synchronous; run it off the event loop
+        chatbot_responses = await asyncio.to_thread(self.get_responses, c_q_a_triplets)
+        return await self.evaluate_responses(
+            c_q_a_triplets,
+            chatbot_responses,
+            use_batch_api,
+            skipped_inputs=skipped_inputs,
+        )
 
+    async def _generate_and_evaluate(self, triplets_file_path, use_batch_api=False):
+        c_q_a_triplets, skipped = await self._generate_triplets(
+            self.iter_pages(), use_batch_api
+        )
+        # An incomplete triplets file would be reused as-is by later runs; only
+        # save it once every page produced its triplet (a re-run fills the gaps
+        # from the cache)
+        if skipped:
+            print(f"Not saving {triplets_file_path}: {len(skipped)} pages skipped")
+        else:
             self.save_triplets(c_q_a_triplets, triplets_file_path)
+        return await self._evaluate_triplets(
+            c_q_a_triplets, use_batch_api, skipped_inputs=len(skipped)
+        )
 
-            chatbot_responses = self.get_responses(c_q_a_triplets)
-            response_scores = self.evaluate_responses(c_q_a_triplets, chatbot_responses)
-            self.save_scores(response_scores, c_q_a_triplets, chatbot_responses)
-            return response_scores
+    def run_evaluation(
+        self,
+        use_existing_triplets=False,
+        triplets_file_path="triplets.xlsx",
+        use_batch_api=False,
+    ):
+        if use_existing_triplets and os.path.exists(triplets_file_path):
+            return self.evaluate_existing_triplets(triplets_file_path, use_batch_api)
+        else:
+            # Single event loop for the whole run so the async client is reused
+            return asyncio.run(
+                self._generate_and_evaluate(triplets_file_path, use_batch_api)
+            )
@@ -0,0 +1,100 @@
+import time
+import asyncio
+import tiktoken
+
+# ------------------------------------------------------------
+# Client-side throttling for the OpenAI API; requests wait for
+# request/token budget up front instead of failing with a 429
+# and backing off blindly
+# ------------------------------------------------------------
+
+
+class TokenBucket:
+    def __init__(self, capacity_per_minute):
+        self.capacity = capacity_per_minute
+        self.tokens = capacity_per_minute
+        self.last_refill = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        # Refill continuously at capacity/60 per second, never above capacity
+        now = time.monotonic()
+        elapsed = now - self.last_refill
+        self.tokens = min(self.capacity, self.tokens + elapsed * self.capacity / 60)
+        self.last_refill = now
+
+    async def acquire(self, amount):
+        # A request larger than the whole bucket could never be served; cap it
+        amount = min(amount, self.capacity)
+        # Holding the lock while sleeping serves waiters in FIFO order
+        async with self._lock:
+            self._refill()
+            while self.tokens < amount:
+                await asyncio.sleep((amount - self.tokens) * 60 / self.capacity)
+                self._refill()
+            self.tokens -= amount
+
+    def retune(self, limit=None, remaining=None):
+        self._refill()
+        if limit:
+            self.capacity = limit
+        if remaining is not None:
+            self.tokens = min(self.tokens, remaining)
+
+
+class RateLimitedClient:
+    def __init__(
+        self,
+        client,
+        max_concurrency=20,
+        requests_per_minute=500,
+        tokens_per_minute=30000,
+    ):
+        self.client = client
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        self.rpm_bucket = TokenBucket(requests_per_minute)
+        self.tpm_bucket = TokenBucket(tokens_per_minute)
+        self._encodings = {}
+
+    def encoding_for(self, model):
+        if model not in self._encodings:
+            try:
+                self._encodings[model] = tiktoken.encoding_for_model(model)
+            except KeyError:
+                self._encodings[model] = tiktoken.get_encoding("o200k_base")
+        return self._encodings[model]
+
+    def estimate_tokens(self, model, messages, max_tokens=0):
+        # OpenAI counts max_tokens against the TPM limit, not the actual completion
+        encoding = self.encoding_for(model)
+        prompt_tokens = sum(
+            len(encoding.encode(message["content"])) + 4 for message in messages
+        )
+        return prompt_tokens + max_tokens
+
+    def _retune(self, headers):
+        def _header(name):
+            value = headers.get(name)
+            return int(value) if value and value.isdigit() else None
+
+        self.rpm_bucket.retune(
+            limit=_header("x-ratelimit-limit-requests"),
+            remaining=_header("x-ratelimit-remaining-requests"),
+        )
+        self.tpm_bucket.retune(
+            limit=_header("x-ratelimit-limit-tokens"),
+            remaining=_header("x-ratelimit-remaining-tokens"),
+        )
+
+    async def create(self, **kwargs):
+        est_tokens = self.estimate_tokens(
+            kwargs["model"], kwargs["messages"], kwargs.get("max_tokens", 0)
+        )
+        async with self.semaphore:
+            await self.rpm_bucket.acquire(1)
+            await self.tpm_bucket.acquire(est_tokens)
+            raw_response = await self.client.chat.completions.with_raw_response.create(
+                **kwargs
+            )
+        self._retune(raw_response.headers)
+        return raw_response.parse()
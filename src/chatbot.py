@@ -1,3 +1,6 @@
+# Standard library imports
+import functools
+
 # Local application imports
 from config.config import Config
 from src.response_engine import ResponseEngine
@@ -19,6 +22,8 @@ class Chatbot:
         self.short_term_mem = ShortTermMemory()
         model = Config.get("inference_model")
         self.resp_engine = ResponseEngine(model)
+        # Retrieval results are cached per query for the whole session
+        self._retrieve = functools.lru_cache(maxsize=256)(self._retrieve_context)
 
     def recall_messages(self):
         """
@@ -44,6 +49,7 @@ class Chatbot:
             type (str): The type of information being memorized.
         """
         self.long_term_mem.add_documents(files, type)
+        self._retrieve.cache_clear()
 
     def forget_info(self, collections):
         """
@@ -53,6 +59,7 @@ class Chatbot:
             collections (str): The collections to forget information from.
         """
         self.long_term_mem.delete_documents(collections)
+        self._retrieve.cache_clear()
 
     def respond_w_sources(self, user_prompt):
         """
@@ -70,11 +77,7 @@ class Chatbot:
         recent_messages = self.short_term_mem.recall_messages(limit=5, to_str=True)
         query = self._create_query(user_prompt, recent_messages)
 
-        # Enrich the query with relevant facts from long-term memory
-        context, sources = self.long_term_mem.get_context(query)
-        llm_prompt = TemplateManager.get("llm_prompt", query=query, context=context)
-
-        response = self.resp_engine.generate_response(llm_prompt)
+        response, _, sources = self._respond_w_memory(query)
         response_n_sources = f"{response}\n\n{sources}"
         self.short_term_mem.add_message(
             {"role": "assistant", "content": response_n_sources}
@@ -92,16 +95,38 @@ class Chatbot:
         Returns:
             str: The response with context.
         """
-        # Enrich the query with relevant facts from long-term memory
-        context, sources = self.long_term_mem.get_context(user_prompt)
-        llm_prompt = TemplateManager.get(
-            "llm_prompt", query=user_prompt, context=context
-        )
-
-        response = self.resp_engine.generate_response(llm_prompt)
+        response, context, _ = self._respond_w_memory(user_prompt)
         response_n_context = f"RESPONSE: {response}\n\nCONTEXT: {context}"
         return response_n_context
 
+    def _retrieve_context(self, query):
+        """
+        Retrieve the context and sources relevant to a query from long-term memory.
+
+        Args:
+            query (str): The self-contained query.
+
+        Returns:
+            tuple: The context and the sources consulted.
+        """
+        return self.long_term_mem.get_context(query)
+
+    def _respond_w_memory(self, query):
+        """
+        Generate a response to a query enriched with facts from long-term memory.
+
+        Args:
+            query (str): The self-contained query.
+
+        Returns:
+            tuple: The response, the context used and the sources consulted.
+        """
+        context, sources = self._retrieve(query)
+        llm_prompt = TemplateManager.get("llm_prompt", query=query, context=context)
+
+        response = self.resp_engine.generate_response(llm_prompt)
+        return response, context, sources
+
     def _create_query(self, prompt, recent_messages):
         """
         Create a self-contained query from the user prompt and recent chat history.
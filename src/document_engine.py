@@ -1,7 +1,7 @@
 # Standard library imports
 import re
 from dataclasses import dataclass, field
-from typing import List
+from typing import Iterator, List
 
 # Third-party imports
 import fitz  # PyMuPDF
@@ -123,59 +123,58 @@ class DocumentEngine:
 
         return doc
 
-    def _docs_from_decree_files(self, files: List[str]) -> List[Document]:
+    def _docs_from_decree_files(self, files: List[str]) -> Iterator[Document]:
         """
-        Generate a list of Document objects from decree files.
+        Yield Document objects from decree files, one page at a time.
 
         Args:
             files (List[str]): A list of file paths to decree files.
 
-        Returns:
-            List[Document]: A list of Document objects generated from the decree files.
+        Yields:
+            Document: The Document objects generated from the decree files.
         """
-        documents = []
         decree_number_n_date_pattern = re.compile(
             r"Decreto Nº(\d+) de (\d{2}/\d{2}/\d{4})", re.DOTALL
         )
         previous_decree_number = None  # Track the decree number across pages
 
         for file_path in files:
-            pdf = fitz.open(file_path)
-            for page_num in tqdm(range(len(pdf)), desc=f"Processing {file_path}"):
-                raw_text = pdf[page_num].get_text("text")
-                text = self._clean_text(raw_text)
-
-                number_n_date = decree_number_n_date_pattern.search(text)
-                number = number_n_date.group(1) if number_n_date else None
-                date = number_n_date.group(2) if number_n_date else None
-                multi_page_decree = (
-                    number == previous_decree_number
-                )  # Determine if this page continues the previous decree
-
-                decree_type = self._identify_decree_type(text)
-                if decree_type == "standard":
-                    doc = self._parse_standard_decree(
-                        text, page_num + 1, number, date, multi_page_decree
-                    )
-                elif decree_type == "SEPEI":
-                    doc = self._parse_SEPEI_decree(text, page_num + 1, number, date)
-
-                documents.append(doc)
-                previous_decree_number = number
-
-            pdf.close()
-        return documents
-
-    def generate_documents(self, files, files_type) -> List[Document]:
+            with fitz.open(file_path) as pdf:
+                for page_num in tqdm(range(len(pdf)), desc=f"Processing {file_path}"):
+                    raw_text = pdf[page_num].get_text("text")
+                    text = self._clean_text(raw_text)
+
+                    number_n_date = decree_number_n_date_pattern.search(text)
+                    number = number_n_date.group(1) if number_n_date else None
+                    date = number_n_date.group(2) if number_n_date else None
+                    multi_page_decree = (
+                        number == previous_decree_number
+                    )  # Determine if this page continues the previous decree
+
+                    decree_type = self._identify_decree_type(text)
+                    if decree_type == "standard":
+                        doc = self._parse_standard_decree(
+                            text, page_num + 1, number, date, multi_page_decree
+                        )
+                    elif decree_type == "SEPEI":
+                        doc = self._parse_SEPEI_decree(text, page_num + 1, number, date)
+
+                    yield doc
+                    previous_decree_number = number
+
+    def generate_documents(self, files, files_type) -> Iterator[Document]:
         """
-        Generate a list of Document objects from the given files.
+        Generate Document objects from the given files.
+
+        Documents are produced lazily, page by page, so callers can start working
+        on them while the remaining files are still being read.
 
         Args:
             files: A single file path or a list of file paths.
             files_type: The type of files being processed.
 
         Returns:
-            List[Document]: A list of Document objects generated from the files.
+            Iterator[Document]: The Document objects generated from the files.
 
         Raises:
             ValueError: If the file type is unsupported.
@@ -184,7 +183,6 @@ class DocumentEngine:
         if not isinstance(files, list):
             files = [files]
 
-        documents = []
         if files_type == "decrees":
             # Generate documents from decree files
             documents = self._docs_from_decree_files(files)
@@ -0,0 +1,93 @@
+# Standard library imports
+import json
+from typing import Callable, List, Optional
+
+# Third-party imports
+import numpy as np
+from milvus_model.sparse import BM25EmbeddingFunction
+
+# Local application imports
+from src.memory.bm25s_embedding import BM25SEmbeddingFunction
+
+
+def save_bm25_model(bm25_ef, base_path: str) -> None:
+    """
+    Save a fitted BM25 model as an IDF array (.npz) plus vocabulary and parameters (.json).
+
+    Both BM25EmbeddingFunction and BM25SEmbeddingFunction are supported; the term
+    at position i of the vocabulary is the term with sparse index i.
+
+    Args:
+        bm25_ef: The fitted BM25 embedding function.
+        base_path (str): Path without extension; ".npz" and ".json" are appended.
+    """
+    if isinstance(bm25_ef, BM25SEmbeddingFunction):
+        vocab = sorted(bm25_ef.vocab, key=bm25_ef.vocab.get)
+        idf = np.asarray(bm25_ef.idf)
+        params = {"backend": "bm25s"}
+    else:
+        # milvus-model keeps the IDF as {term: [value, index]}
+        vocab, idf = [None] * len(bm25_ef.idf), np.zeros(len(bm25_ef.idf))
+        for term, (value, index) in bm25_ef.idf.items():
+            vocab[index], idf[index] = term, value
+        params = {"backend": "milvus", "epsilon": bm25_ef.epsilon}
+
+    params.update(
+        corpus_size=bm25_ef.corpus_size,
+        avgdl=bm25_ef.avgdl,
+        k1=bm25_ef.k1,
+        b=bm25_ef.b,
+        vocab=vocab,
+    )
+
+    np.savez(f"{base_path}.npz", idf=idf)
+    with open(f"{base_path}.json", "w", encoding="utf-8") as file:
+        json.dump(params, file, ensure_ascii=False)
+
+
+def load_bm25_model(
+    base_path: str,
+    analyzer: Callable[[str], List[str]],
+    backend: Optional[str] = None,
+):
+    """
+    Rebuild a BM25 model saved with save_bm25_model.
+
+    Both backends encode documents with the same term-frequency formula and
+    queries with the stored IDF, so a model saved from one backend can be loaded
+    into the other and still produces the same vectors.
+
+    Args:
+        base_path (str): Path without extension, as passed to save_bm25_model.
+        analyzer (Callable[[str], List[str]]): The tokenizer the model was fitted with.
+        backend (Optional[str]): "bm25s" or "milvus"; defaults to the backend the
+            model was saved from.
+
+    Returns:
+        A BM25SEmbeddingFunction for the "bm25s" backend, else a BM25EmbeddingFunction.
+    """
+    with open(f"{base_path}.json", "r", encoding="utf-8") as file:
+        params = json.load(file)
+    with np.load(f"{base_path}.npz") as arrays:
+        idf = arrays["idf"]
+
+    vocab = params["vocab"]
+    if (backend or params["backend"]) == "bm25s":
+        bm25_ef = BM25SEmbeddingFunction(analyzer, k1=params["k1"], b=params["b"])
+        bm25_ef.vocab = {term: index for index, term in enumerate(vocab)}
+        bm25_ef.idf = idf.astype(np.float32)
+    else:
+        bm25_ef = BM25EmbeddingFunction(
+            analyzer,
+            k1=params["k1"],
+            b=params["b"],
+            epsilon=params.get("epsilon", 0.25),
+        )
+        bm25_ef.idf = {
+            term: [value, index]
+            for index, (term, value) in enumerate(zip(vocab, idf.tolist()))
+        }
+
+    bm25_ef.corpus_size = params["corpus_size"]
+    bm25_ef.avgdl = params["avgdl"]
+    return bm25_ef
@@ -0,0 +1,134 @@
+# Standard library imports
+from typing import Callable, Dict, List
+
+# Third-party imports
+import bm25s
+import numpy as np
+from scipy.sparse import csr_array
+from bm25s.tokenization import Tokenized
+
+
+class BM25SEmbeddingFunction:
+    """
+    Drop-in replacement for milvus-model's BM25EmbeddingFunction backed by BM25S.
+
+    Corpus statistics are computed by BM25S's vectorised indexer, and documents
+    and queries are encoded with NumPy instead of one csr_array per text. The
+    vectors follow the same convention as BM25EmbeddingFunction: documents carry
+    the term-frequency part of the BM25 score and queries carry the IDF, so
+    their inner product is the BM25 score of the document for the query.
+    """
+
+    def __init__(
+        self, analyzer: Callable[[str], List[str]], k1: float = 1.5, b: float = 0.75
+    ):
+        """
+        Initialize the embedding function with an analyzer and BM25 parameters.
+
+        Args:
+            analyzer (Callable[[str], List[str]]): Tokenizer used for both documents and queries.
+            k1 (float): Term frequency saturation parameter.
+            b (float): Document length normalization parameter.
+        """
+        self.analyzer = analyzer
+        self.k1 = k1
+        self.b = b
+        self.corpus_size = 0
+        self.avgdl = 0.0
+        self.vocab: Dict[str, int] = {}
+        self.idf = np.zeros(0, dtype=np.float32)
+
+    @property
+    def dim(self) -> int:
+        """Size of the vocabulary, i.e. the dimension of the sparse vectors."""
+        return len(self.vocab)
+
+    def fit(self, corpus: List[str]):
+        """
+        Compute the vocabulary, IDF values and average document length of a corpus.
+
+        Args:
+            corpus (List[str]): The documents to fit the model on.
+        """
+        vocab: Dict[str, int] = {}
+        ids = [
+            [vocab.setdefault(term, len(vocab)) for term in self.analyzer(text)]
+            for text in corpus
+        ]
+
+        retriever = bm25s.BM25(k1=self.k1, b=self.b, method="lucene")
+        retriever.index(
+            Tokenized(ids=ids, vocab=vocab),
+            create_empty_token=False,
+            show_progress=False,
+        )
+
+        # The score matrix is stored column-wise (one column per term), so the
+        # number of non-zero entries in each column is the document frequency
+        doc_freqs = np.diff(retriever.scores["indptr"]).astype(np.float32)
+
+        self.corpus_size = len(ids)
+        self.avgdl = sum(len(doc_ids) for doc_ids in ids) / max(self.corpus_size, 1)
+        self.vocab = vocab
+        self.idf = np.log(
+            1 + (self.corpus_size - doc_freqs + 0.5) / (doc_freqs + 0.5)
+        ).astype(np.float32)
+
+    def _term_counts(self, texts: List[str]):
+        # Vocabulary ids and their counts for each text; unknown terms are dropped
+        for text in texts:
+            terms = self.analyzer(text)
+            ids = np.fromiter(
+                (self.vocab[term] for term in terms if term in self.vocab),
+                dtype=np.int64,
+            )
+            yield (*np.unique(ids, return_counts=True), len(terms))
+
+    def _to_csr(self, rows) -> csr_array:
+        indices, data, indptr = [], [], [0]
+        for row_indices, row_data in rows:
+            indices.append(row_indices)
+            data.append(row_data)
+            indptr.append(indptr[-1] + len(row_indices))
+
+        return csr_array(
+            (
+                np.concatenate(data) if data else np.zeros(0, dtype=np.float32),
+                np.concatenate(indices) if indices else np.zeros(0, dtype=np.int64),
+                np.asarray(indptr),
+            ),
+            shape=(len(indptr) - 1, self.dim),
+        )
+
+    def encode_documents(self, documents: List[str]) -> csr_array:
+        """
+        Encode documents into sparse vectors holding the BM25 term-frequency weights.
+
+        Args:
+            documents (List[str]): The documents to encode.
+
+        Returns:
+            csr_array: One row per document.
+        """
+        rows = []
+        for ids, counts, doc_len in self._term_counts(documents):
+            norm = self.k1 * (1 - self.b + self.b * doc_len / self.avgdl)
+            rows.append(
+                (ids, (counts * (self.k1 + 1) / (counts + norm)).astype(np.float32))
+            )
+        return self._to_csr(rows)
+
+    def encode_queries(self, queries: List[str]) -> csr_array:
+        """
+        Encode queries into sparse vectors holding the IDF of each query term.
+
+        Args:
+            queries (List[str]): The queries to encode.
+
+        Returns:
+            csr_array: One row per query.
+        """
+        return self._to_csr(
+            (ids, self.idf[ids] * counts)
+            for ids, counts, _ in self._term_counts(queries)
+        )
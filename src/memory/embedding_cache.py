@@ -0,0 +1,63 @@
+# Standard library imports
+from typing import Any, Callable, List, Optional
+
+# Third-party imports
+import blake3
+import diskcache
+
+
+class EmbeddingCache:
+    """
+    A content-addressed on-disk cache for embeddings.
+
+    Entries are keyed by the model that produced them and the whitespace-normalized
+    text, so the same text is never encoded twice by the same model across runs.
+    """
+
+    def __init__(self, path: str, ttl_seconds: Optional[int] = None):
+        """
+        Open (or create) the cache directory.
+
+        Args:
+            path (str): Directory holding the cache database.
+            ttl_seconds (Optional[int]): Lifetime of new entries; None keeps them forever.
+        """
+        self._cache = diskcache.Cache(path)
+        self.ttl_seconds = ttl_seconds
+
+    @staticmethod
+    def _key(model: str, text: str) -> str:
+        normalized_text = " ".join(text.split())
+        return blake3.blake3(f"{model}|{normalized_text}".encode()).hexdigest()[:32]
+
+    def get_or_encode(
+        self,
+        model: str,
+        texts: List[str],
+        encode: Callable[[List[str]], List[Any]],
+    ) -> List[Any]:
+        """
+        Return the cached value for each text, encoding all misses in a single call.
+
+        Args:
+            model (str): Identifier of the model (and mode) producing the values.
+            texts (List[str]): The texts to look up.
+            encode (Callable[[List[str]], List[Any]]): Encodes a list of texts into
+                one value per text; only called with the texts that missed.
+
+        Returns:
+            List[Any]: One value per text, in the order of texts.
+        """
+        keys = [self._key(model, text) for text in texts]
+        values = [self._cache.get(key) for key in keys]
+
+        misses = [i for i, value in enumerate(values) if value is None]
+        if misses:
+            encoded = encode([texts[i] for i in misses])
+            # A single transaction commits all new entries at once
+            with self._cache.transact():
+                for i, value in zip(misses, encoded):
+                    values[i] = value
+                    self._cache.set(keys[i], value, expire=self.ttl_seconds)
+
+        return values
@@ -1,14 +1,22 @@
 # Standard library imports
 import os
 import json
+import asyncio
 import pickle
 import logging
+import threading
+import multiprocessing
 from pathlib import Path
-from typing import Dict, List, Optional
+from itertools import islice
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
 
 # Third-party library imports
 import nltk
+import blake3
 import torch
+import numpy as np
 from tqdm import tqdm
 
 from milvus_model.sparse import BM25EmbeddingFunction
@@ -16,18 +24,62 @@ from milvus_model.hybrid import BGEM3EmbeddingFunction
 from milvus_model.sparse.bm25.tokenizers import build_default_analyzer
 
 from pymilvus.orm.schema import CollectionSchema, FieldSchema
-from pymilvus import Collection, DataType, MilvusClient, connections
+from pymilvus import (
+    AsyncMilvusClient,
+    Collection,
+    DataType,
+    MilvusClient,
+    connections,
+)
 from pymilvus.client.abstract import AnnSearchRequest, SearchResult, WeightedRanker
 
 # Local application imports
 from config.config import Config
 from src.utils.utils import setup_logging
 from src.utils.ner_extraction import EntityExtractor
+from src.memory.bm25s_embedding import BM25SEmbeddingFunction
+from src.memory.embedding_cache import EmbeddingCache
+from src.memory.bm25_store import load_bm25_model, save_bm25_model
 from src.document_engine import Document, DocumentEngine
 
 # Setup logging
 setup_logging()
 
+# Per-process state for the chunking workers used during bulk ingestion
+_worker_doc_engine = None
+_worker_ner_extractor = None
+
+
+def _init_chunk_worker(locations_file: str) -> None:
+    """
+    Load the document engine and the spaCy pipeline once per worker process.
+
+    Args:
+        locations_file (str): Path to the JSON file containing location data.
+    """
+    global _worker_doc_engine, _worker_ner_extractor
+    _worker_doc_engine = DocumentEngine()
+    _worker_ner_extractor = EntityExtractor(locations_file)
+
+
+def _chunk_and_extract(documents: List[Document]) -> List[Document]:
+    """
+    Chunk a batch of documents and store the entities of each chunk in its metadata.
+
+    Args:
+        documents (List[Document]): The documents to chunk.
+
+    Returns:
+        List[Document]: The chunks, with their entities under metadata["entities"].
+    """
+    chunks = _worker_doc_engine._chunk_documents(documents)
+    all_entities = _worker_ner_extractor.extract_entities_batch(
+        [chunk.text for chunk in chunks]
+    )
+    for chunk, entities in zip(chunks, all_entities):
+        chunk.metadata["entities"] = entities
+    return chunks
+
 
 class LongTermMemory:
     def __init__(self):
@@ -45,6 +97,19 @@ class LongTermMemory:
         self._dense_ef = self._load_embedding_function("dense")
         self._sparse_ef = self._load_embedding_function("sparse")
 
+        # Cache of dense and sparse embeddings keyed by model and text; the BM25
+        # key includes a hash of the fitted model so refitting invalidates it
+        self._embedding_cache = EmbeddingCache(
+            Config.get("embedding_cache_path"),
+            Config.get("embedding_cache_ttl_seconds"),
+        )
+        self._dense_model_key = "BAAI/bge-m3"
+        self._sparse_model_key = self._sparse_model_fingerprint()
+
+        # The embedding models and the spaCy pipeline are not safe to call from
+        # several threads at once; Milvus and LLM calls can run concurrently
+        self._encode_lock = threading.Lock()
+
         self._docs, self._chunks = None, None
         self._load_collections()
 
@@ -59,39 +124,62 @@ class LongTermMemory:
         if ef_type == "sparse":
             # More info here: https://milvus.io/docs/embed-with-bm25.md
             # If a bm25 model already exists, load it. Otherwise, create a new one.
-            model_path = Config.get("sparse_embed_func_path")
-            if os.path.exists(model_path):
+            # The model is stored as {base}.npz (IDF values) and {base}.json
+            # (vocabulary and parameters); {base}.pkl is the legacy pickled format
+            base_path = Config.get("sparse_embed_func_path")
+
+            # Check if the 'stopwords' dataset is already installed in NLTK's data path
+            try:
+                nltk.data.find("corpora/stopwords")
+            except LookupError:
+                # Download the 'stopwords' dataset using NLTK's download utility
+                nltk.download("stopwords", quiet=True)
+
+            # Create an analyzer for processing documents, here specifying Spanish language
+            analyzer = build_default_analyzer(language="sp")
+
+            # "bm25s" computes the corpus statistics and encodings with NumPy; saved
+            # models of either backend are loaded into the configured one
+            backend = Config.get("bm25_backend")
+
+            if os.path.exists(f"{base_path}.pkl") and not os.path.exists(
+                f"{base_path}.json"
+            ):
+                # Migrate a pickled model to the array format
+                with open(f"{base_path}.pkl", "rb") as file:
+                    save_bm25_model(pickle.load(file), base_path)
+
+            if os.path.exists(f"{base_path}.json"):
                 # Load the existing model
-                with open(model_path, "rb") as file:
-                    bm25_ef = pickle.load(file)
+                bm25_ef = load_bm25_model(base_path, analyzer, backend)
             else:
-                # Check if the 'stopwords' dataset is not already loaded in NLTK
-                if "stopwords" not in nltk.corpus.util.lazy_imports:
-                    # Download the 'stopwords' dataset using NLTK's download utility
-                    nltk.download("stopwords")
-
-                # Create an analyzer for processing documents, here specifying Spanish language
-                analyzer = build_default_analyzer(language="sp")
                 # Initialize a BM25 embedding function with the previously created analyzer
-                bm25_ef = BM25EmbeddingFunction(analyzer)
+                if backend == "bm25s":
+                    bm25_ef = BM25SEmbeddingFunction(analyzer)
+                else:
+                    bm25_ef = BM25EmbeddingFunction(analyzer)
 
                 # Check if a corpus is provided to fit the model
                 if corpus:
                     # Fit the BM25 embedding function to the provided corpus
                     bm25_ef.fit(corpus)
-                    # Serialize the BM25 model into a file for persistence
-                    with open(model_path, "wb") as file:
-                        pickle.dump(
-                            bm25_ef, file
-                        )  # Use Python's pickle module for serialization
+                    # Save the fitted arrays for persistence
+                    save_bm25_model(bm25_ef, base_path)
 
             return bm25_ef
         elif ef_type == "dense":
-            # Determina el dispositivo en función de la disponibilidad de CUDA
-            device = "cuda:0" if torch.cuda.is_available() else "cpu"
+            # Determina el dispositivo a partir de la configuración; con "auto" (o sin
+            # valor) usa el dispositivo CUDA actual si está disponible, si no la CPU
+            device = Config.get("embed_device") or "auto"
+            if device == "auto":
+                device = (
+                    f"cuda:{torch.cuda.current_device()}"
+                    if torch.cuda.is_available()
+                    else "cpu"
+                )
 
-            # Configura la función de embedding para usar GPU si está disponible, y FP16 si es apropiado
-            use_fp16 = True if device.startswith("cuda") else False
+            # FP16 en GPU: los pesos se convierten a media precisión (tensor cores)
+            use_fp16 = device.startswith("cuda")
 
             # Más información aquí: https://milvus.io/docs/embed-with-bgm-m3.md
             bgeM3_ef = BGEM3EmbeddingFunction(
@@ -106,6 +194,16 @@ class LongTermMemory:
         else:
             raise ValueError(f"Unsupported embedding function type: {ef_type}")
 
+    def _sparse_model_fingerprint(self) -> str:
+        base_path = Config.get("sparse_embed_func_path")
+        hasher = blake3.blake3()
+        for path in (f"{base_path}.json", f"{base_path}.npz"):
+            if not os.path.exists(path):
+                return "bm25"
+            with open(path, "rb") as file:
+                hasher.update(file.read())
+        return f"bm25:{hasher.hexdigest()[:16]}"
+
     def _load_collections(self):
         # RES_LOAD (reset and load): delete all documents and load new ones
         # RES_LOAD_FILES (reset database and load files): load chunks from files; used to recover from errors
@@ -120,6 +218,10 @@ class LongTermMemory:
         # Load documents and chunks from the raw data folder
         self._ingest_folder()
 
+        # On RES_LOAD the chunk indexes are built once, after the bulk insert
+        if self.run_mode == "RES_LOAD":
+            self._build_chunk_indexes()
+
     def _ingest_folder(self):
         # Define paths using configuration settings
         raw_folder = Path(Config.get("raw_data_folder"))
@@ -127,30 +229,10 @@ class LongTermMemory:
         if self.run_mode == "RES_LOAD":
             # Read and generate documents from PDF files in the raw data folder
             files = [str(file) for file in raw_folder.glob("*.pdf")]
+            # Documents are parsed lazily; each batch's document records are inserted
+            # as it enters the chunking pipeline
             documents = self._doc_engine.generate_documents(files, "decrees")
-
-            # Insert the generated document records into the database
-            doc_records = self._generate_doc_records(documents)
-            self._client.insert(collection_name="docs", data=doc_records)
-            logging.info(f"Finished inserting {len(doc_records)} document records.")
-
-            self._process_and_insert_chunks(documents)
-
-    def _process_documents(self, documents):
-        chunk_records = []
-        chunks = self._doc_engine._chunk_documents(documents)
-
-        # Generate chunk records including embeddings
-        chunk_records.extend(self._generate_chunk_records(chunks))
-
-        return chunk_records
-
-    def _insert_chunk_records(self, chunk_records):
-        """
-        Batch load chunk records, including embeddings, into the _chunks collection.
-        """
-        self._chunks.insert(chunk_records)
-        logging.info(f"Inserted {len(chunk_records)} chunk records.")
+            asyncio.run(self._process_and_insert_chunks(documents))
 
     def _load_docs_collection(self):
         if not self._client.has_collection("docs"):
@@ -183,23 +265,41 @@ class LongTermMemory:
     def _load_chunks_collection(self):
         if not self._client.has_collection("chunks"):
             schema = self._create_chunks_schema()
-            self._client.create_collection(collection_name="chunks", schema=schema)
+            # Several shards spread inserts across datanodes; Milvus routes each row
+            # by a hash of its primary key, so chunk ids need no extra handling
+            self._client.create_collection(
+                collection_name="chunks",
+                schema=schema,
+                shards_num=Config.get("chunks_shards") or 4,
+            )
+
+        # On RES_LOAD the freshly created collection stays unindexed (and released)
+        # while it is bulk loaded; _load_collections builds the indexes afterwards
+        if self.run_mode != "RES_LOAD":
+            self._build_chunk_indexes()
+
+        return Collection(name="chunks")
 
+    def _build_chunk_indexes(self):
+        """
+        Create the dense and sparse indexes of the _chunks collection and load it for search.
+        """
         # Define index parameters for both fields as a list of dictionaries
         index_params = [
             {
                 "field_name": "dense_vector",
                 "params": {
                     "metric_type": "IP",  # Inner Product, assuming normalized vectors for cosine similarity
-                    "index_type": "IVF_FLAT",
-                    "params": {"nlist": 128},
+                    "index_type": "HNSW",
+                    "params": {"M": 16, "efConstruction": 200},
                 },
             },
             {
                 "field_name": "sparse_vector",
                 "params": {
                     "metric_type": "IP",  # Inner Product
-                    # Assuming default index_type and other parameters if needed
+                    "index_type": "SPARSE_INVERTED_INDEX",
+                    "params": {"drop_ratio_build": 0.0},  # Keep every BM25 term
                 },
             },
         ]
@@ -211,7 +311,6 @@ class LongTermMemory:
         )
 
         self._client.load_collection("chunks")
-        return Collection(name="chunks")
 
     def _create_docs_schema(self) -> CollectionSchema:
         """
@@ -260,13 +359,13 @@ class LongTermMemory:
                 ),
                 FieldSchema(
                     name="dense_vector",
-                    dtype=DataType.FLOAT_VECTOR,
+                    dtype=DataType.FLOAT16_VECTOR,  # Half the memory of FLOAT_VECTOR
                     dim=self._dense_ef.dim["dense"],
                 ),
+                # Stored as {term index: weight}; only the non-zero BM25 terms
                 FieldSchema(
                     name="sparse_vector",
-                    dtype=DataType.FLOAT_VECTOR,
-                    dim=self._sparse_ef.dim,
+                    dtype=DataType.SPARSE_FLOAT_VECTOR,
                 ),
                 FieldSchema(
                     name="parent_id",
@@ -300,79 +399,155 @@ class LongTermMemory:
 
     def add_documents(self, files: List[str], type: str = "decrees") -> None:
         logging.info(f"Adding documents of type {type} to the database.")
-        # Generate documents, format them into database records, and insert them
+        # Generate documents lazily; document and chunk records are inserted batch by batch
         documents = self._doc_engine.generate_documents(files, type)
-        doc_records = self._generate_doc_records(documents)
-        self._client.insert(collection_name="docs", data=doc_records)
-
-        # Generate chunks, format them into database records, and insert them
-        logging.info("Processing and inserting chunk records.")
-        self._process_and_insert_chunks(documents)
+        logging.info("Processing and inserting document and chunk records.")
+        asyncio.run(self._process_and_insert_chunks(documents))
 
-    def _process_and_insert_chunks(
+    async def _process_and_insert_chunks(
         self, documents, batch_size: int = 10, start_from: int = 0
     ):
         """
-        Process documents in batches, create chunk records, insert them into the database,
-        and log the process with a progress bar. Updated to include a starting index.
+        Process documents in batches, insert their document records, create chunk records,
+        insert them into the database, and log the process with a progress bar. Updated to
+        include a starting index.
+
+        Documents are consumed lazily, so parsing overlaps with the rest of the work.
+        Batches flow through a three-stage pipeline so that each resource stays busy:
+        chunking and NER run in worker processes, embedding runs on a worker thread
+        (one batch at a time on the model's device), and inserts are sent through an
+        AsyncMilvusClient with up to insert_concurrency batches in flight.
 
         Args:
-            documents (List[Document]): List of Document objects to process.
+            documents (Iterable[Document]): Document objects to process.
             batch_size (int): Number of documents to process in each batch.
             start_from (int): Index to start processing from.
         """
-
-        # Adjust total batches based on the new start_from parameter
-        adjusted_docs = documents[start_from:]
-        num_batches = len(adjusted_docs) // batch_size + (
-            1 if len(adjusted_docs) % batch_size > 0 else 0
+        # Skip the first start_from documents without materializing them
+        documents = islice(documents, start_from, None)
+        num_workers = Config.get("ingest_workers") or 2
+        insert_concurrency = Config.get("insert_concurrency") or 4
+
+        # The async client is bound to this event loop, so it lives for one ingest
+        async_client = AsyncMilvusClient(
+            uri=f"http://{Config.get('MILVUS_HOST')}:{Config.get('MILVUS_PORT')}"
         )
 
-        # Process documents in batches starting from start_from
-        for i in tqdm(
-            range(num_batches), desc="Processing and inserting document chunks"
-        ):
-            # Adjust batch slice indices based on start_from
-            start_idx = start_from + i * batch_size
-            end_idx = min(start_from + (i + 1) * batch_size, len(documents))
-
-            # Select batch documents
-            batch_documents = documents[start_idx:end_idx]
-
-            try:
-                # Generate and insert chunk records for the current batch
-                self._process_and_insert_chunk_batch(batch_documents)
-            except Exception as e:
-                # Log the next start_from value before raising the error
-                next_start_from = (
-                    start_idx + batch_size
-                )  # Or end_idx for more precision
-                logging.error(
-                    f"Error processing documents. Next start_from should be: {next_start_from}. Error: {e}"
+        chunk_futures, insert_tasks = deque(), deque()
+        current_start = next_batch_start = start_from
+        num_doc_records = 0
+        progress = tqdm(desc="Processing and inserting document chunks")
+
+        def read_document_batch():
+            # Parse the next batch of documents and write their document records.
+            # These are written ahead of the chunks, so a run resumed from the
+            # logged start_from rewrites some of them: upsert keeps that idempotent
+            nonlocal num_doc_records
+            batch_documents = list(islice(documents, batch_size))
+            if batch_documents:
+                doc_records = self._generate_doc_records(batch_documents)
+                self._client.upsert(collection_name="docs", data=doc_records)
+                num_doc_records += len(doc_records)
+            return batch_documents
+
+        async def submit_chunking():
+            # Stage A: chunk the next batch and extract its entities in a worker process
+            nonlocal next_batch_start
+            batch_documents = await asyncio.to_thread(read_document_batch)
+            if batch_documents:
+                chunk_futures.append(
+                    (
+                        next_batch_start,
+                        chunk_pool.submit(_chunk_and_extract, batch_documents),
+                    )
                 )
-                raise  # Re-raise the error to stop the process
-
-        logging.info("Completed processing and inserting chunks.")
-
-    def _process_and_insert_chunk_batch(self, batch_documents: List[Document]):
-        """
-        Generate chunk records for a batch of documents and insert them into the database.
-
-        Args:
-            batch_documents (List[Document]): List of Document objects to process.
-        """
+                next_batch_start += len(batch_documents)
 
-        # Generate chunks for the documents
-        chunks = self._doc_engine._chunk_documents(batch_documents)
+        async def wait_oldest_insert():
+            nonlocal current_start
+            current_start, task = insert_tasks.popleft()
+            await task
+            progress.update(1)
 
-        # Generate chunk records, including both dense and sparse embeddings
-        chunk_records = self._generate_chunk_records(chunks)
+        try:
+            # Workers are spawned rather than forked: this process holds the
+            # embedding model (maybe a CUDA context), gRPC channels and threads,
+            # none of which survive a fork; _init_chunk_worker builds their state
+            with ProcessPoolExecutor(
+                max_workers=num_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_chunk_worker,
+                initargs=(Config.get("locations_file"),),
+            ) as chunk_pool:
+                # Keep every worker busy with one batch queued behind it
+                for _ in range(2 * num_workers):
+                    await submit_chunking()
+
+                try:
+                    while chunk_futures:
+                        current_start, future = chunk_futures.popleft()
+                        chunks = await asyncio.wrap_future(future)
+                        await submit_chunking()
+
+                        # Stage B: dense and sparse embeddings for the batch, off the
+                        # event loop so in-flight inserts keep progressing
+                        chunk_records = await asyncio.to_thread(
+                            self._generate_chunk_records, chunks
+                        )
+
+                        # Stage C: start the insert, first waiting for the oldest one
+                        # if the window of in-flight inserts is full
+                        if len(insert_tasks) == insert_concurrency:
+                            await wait_oldest_insert()
+                        insert_tasks.append(
+                            (
+                                current_start,
+                                asyncio.create_task(
+                                    self._insert_chunk_records(
+                                        async_client, chunk_records
+                                    )
+                                ),
+                            )
+                        )
+
+                    while insert_tasks:
+                        await wait_oldest_insert()
+                except BaseException:
+                    # Do not start chunking batches that will never be inserted
+                    for _, future in chunk_futures:
+                        future.cancel()
+                    # Let the in-flight inserts finish, so every batch before the
+                    # resume point below is known to be in the database
+                    outcomes = await asyncio.gather(
+                        *(task for _, task in insert_tasks), return_exceptions=True
+                    )
+                    current_start = min(
+                        [current_start]
+                        + [
+                            batch_start
+                            for (batch_start, _), outcome in zip(insert_tasks, outcomes)
+                            if isinstance(outcome, BaseException)
+                        ]
+                    )
+                    raise
+        except Exception as e:
+            # Log the start of the oldest batch that did not make it into the
+            # database (the failing one, or an earlier failed insert), so that
+            # resuming from there skips no chunks
+            logging.error(
+                f"Error processing documents. Next start_from should be: {current_start}. Error: {e}"
+            )
+            raise  # Re-raise the error to stop the process
+        finally:
+            progress.close()
+            await async_client.close()
 
-        # Insert chunk records into the database
-        self._insert_chunk_records(chunk_records)
+        logging.info(f"Finished inserting {num_doc_records} document records.")
+        logging.info("Completed processing and inserting chunks.")
 
     def _generate_doc_records(self, documents: List[Document]) -> List[Dict[str, any]]:
         records = []
+        doc_size = Config.get("doc_size")
         for doc in documents:
             record = {
                 "id": doc.id,
@@ -384,9 +559,7 @@ class LongTermMemory:
                     if doc.metadata.get("number") is not None
                     else 0
                 ),  # Ensure number is not None
-                "text": doc.text[
-                    : Config.get("doc_size")
-                ],  # Truncate text if necessary
+                "text": doc.text[:doc_size],  # Truncate text if necessary
                 "docs_vector": [0.0, 0.0],  # Dummy vector for the docs_vector field
             }
             records.append(record)
@@ -399,26 +572,55 @@ class LongTermMemory:
         including both dense and sparse embeddings, formatted as dictionaries.
         """
         records = []
+        chunk_size = Config.get("chunk_size")
 
         # Extract chunk texts to generate embeddings
         chunk_texts = [chunk.text for chunk in chunks]
-        # Generate dense embeddings using the BGE-M3 function
-        dense_embeddings = self._dense_ef.encode_documents(chunk_texts)["dense"]
-
-        # Generate sparse embeddings using the BM25 function
-        raw_sparse_embeddings = self._sparse_ef.encode_documents(chunk_texts)
-
-        # Convert sparse embeddings from csr_array format to a list for insertion
-        sparse_embeddings = [
-            sparse_embedding.toarray().tolist()[
-                0
-            ]  # Ensure it's a list of lists, not a list of arrays
-            for sparse_embedding in raw_sparse_embeddings
+
+        # Only texts missing from the embedding cache are sent to the models
+        with self._encode_lock, ThreadPoolExecutor(max_workers=1) as executor:
+            # Generate sparse embeddings using the BM25 function on a separate thread,
+            # overlapping with the dense model (which releases the GIL in its kernels)
+            sparse_future = executor.submit(
+                self._embedding_cache.get_or_encode,
+                f"{self._sparse_model_key}|document",
+                chunk_texts,
+                lambda texts: self._sparse_to_rows(
+                    self._sparse_ef.encode_documents(texts)
+                ),
+            )
+            # Generate dense embeddings using the BGE-M3 function
+            dense_embeddings = self._embedding_cache.get_or_encode(
+                f"{self._dense_model_key}|document",
+                chunk_texts,
+                lambda texts: self._encode_dense_documents(texts).astype(np.float16),
+            )
+            sparse_rows = sparse_future.result()
+
+        # One (N, dim) float16 matrix for the FLOAT16_VECTOR field; pymilvus
+        # serializes its rows without going through Python float lists
+        dense_embeddings = np.asarray(dense_embeddings, dtype=np.float16)
+
+        # Convert sparse embeddings from (indices, values) rows to {index: value} dicts
+        sparse_embeddings = self._sparse_to_dicts(sparse_rows)
+
+        # Entities are extracted by the chunking workers when ingesting in bulk;
+        # any chunk without them goes through spaCy here in a single batch
+        missing = [
+            i for i, chunk in enumerate(chunks) if "entities" not in chunk.metadata
         ]
+        all_entities = [chunk.metadata.get("entities") for chunk in chunks]
+        if missing:
+            with self._encode_lock:
+                extracted = self.ner_extractor.extract_entities_batch(
+                    [chunk_texts[i] for i in missing]
+                )
+            for i, entities in zip(missing, extracted):
+                all_entities[i] = entities
 
         # Prepare records with both embeddings for each chunk
         for i, chunk in tqdm(enumerate(chunks), desc="Generating chunk records"):
-            entities = self.ner_extractor.extract_entities(chunk.text)
+            entities = all_entities[i]
             entities_list = [{"type": ent[0], "value": ent[1]} for ent in entities]
             # Extract the document ID from the chunk ID
             parent_document_id = chunk.id.split("_")[0]
@@ -436,16 +638,87 @@ class LongTermMemory:
 
             record = {
                 "id": chunk.id,
-                "dense_vector": dense_embeddings[i].tolist(),
+                "dense_vector": dense_embeddings[i],
                 "sparse_vector": sparse_embeddings[i],
                 "parent_id": chunk.metadata.get("parent_id", 0),
-                "text": chunk.text[: Config.get("chunk_size")],
+                "text": chunk.text[:chunk_size],
                 "entities": entities_list,
             }
             records.append(record)
 
         return records
 
+    def _encode_dense_documents(self, texts: List[str]) -> np.ndarray:
+        """
+        Generate dense embeddings in fixed-size micro-batches.
+
+        Texts are sorted by length so each batch holds similarly sized texts
+        (less padding), and the embeddings are written into a preallocated
+        matrix in the original order.
+
+        Args:
+            texts (List[str]): Texts to embed.
+
+        Returns:
+            np.ndarray: A (len(texts), dim) float32 matrix of dense embeddings.
+        """
+        batch_size = Config.get("embed_batch_size") or 64
+        dense_out = np.empty(
+            (len(texts), self._dense_ef.dim["dense"]), dtype=np.float32
+        )
+
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        # inference_mode skips autograd bookkeeping entirely
+        with torch.inference_mode():
+            for start in range(0, len(order), batch_size):
+                batch_ids = order[start : start + batch_size]
+                embeddings = self._dense_ef.encode_documents(
+                    [texts[i] for i in batch_ids]
+                )["dense"]
+                dense_out[batch_ids] = np.asarray(embeddings, dtype=np.float32)
+
+        return dense_out
+
+    def _sparse_to_rows(self, sparse_matrix) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """
+        Split a sparse matrix into one (indices, values) pair per row.
+
+        Rows are sliced straight out of the CSR arrays, so the work is
+        proportional to the non-zero entries rather than the vocabulary size.
+
+        Args:
+            sparse_matrix: A scipy sparse matrix or array, one row per text.
+
+        Returns:
+            List[Tuple[np.ndarray, np.ndarray]]: The int32 indices and float32
+            values of the non-zero entries of each row.
+        """
+        csr = sparse_matrix.tocsr()
+        indices = csr.indices.astype(np.int32)
+        data = csr.data.astype(np.float32)
+        return [
+            (indices[start:end], data[start:end])
+            for start, end in zip(csr.indptr[:-1], csr.indptr[1:])
+        ]
+
+    def _sparse_to_dicts(
+        self, sparse_rows: List[Tuple[np.ndarray, np.ndarray]]
+    ) -> List[Dict[int, float]]:
+        """
+        Convert (indices, values) rows into {index: value} dictionaries,
+        the format Milvus expects for SPARSE_FLOAT_VECTOR fields.
+
+        Args:
+            sparse_rows (List[Tuple[np.ndarray, np.ndarray]]): Rows from _sparse_to_rows.
+
+        Returns:
+            List[Dict[int, float]]: One dictionary per row.
+        """
+        return [
+            dict(zip(indices.tolist(), values.tolist()))
+            for indices, values in sparse_rows
+        ]
+
     def _insert_doc_records(self, doc_records: List[List[any]]) -> None:
         """
         Batch load document records into the _docs collection.
@@ -470,23 +743,54 @@ class LongTermMemory:
         self._docs.insert(data_to_insert)
         logging.info(f"Inserted {len(doc_records)} document records.")
 
-    def _insert_chunk_records(self, chunk_records):
+    async def _insert_chunk_records(self, async_client, chunk_records):
         """
         Batch load chunk records, including embeddings, into the _chunks collection.
+
+        Records are sent in sub-batches whose estimated size stays below
+        max_insert_bytes, well under the 64 MiB gRPC message limit.
         """
-        self._chunks.insert(chunk_records)
+        if not chunk_records:
+            return
+
+        max_insert_bytes = Config.get("max_insert_bytes") or 50 * 1024 * 1024
+
+        # Estimate the serialized size of a record: 2 bytes per dense dimension,
+        # 8 bytes per sparse entry (index + value), the text and some overhead
+        avg_sparse_nnz = sum(
+            len(record["sparse_vector"]) for record in chunk_records
+        ) / len(chunk_records)
+        avg_text_bytes = sum(
+            len(record["text"].encode()) for record in chunk_records
+        ) / len(chunk_records)
+        per_record_bytes = (
+            self._dense_ef.dim["dense"] * 2 + avg_sparse_nnz * 8 + avg_text_bytes + 256
+        )
+        sub_batch_size = max(1, int(max_insert_bytes // per_record_bytes))
+
+        for start in range(0, len(chunk_records), sub_batch_size):
+            await async_client.insert(
+                collection_name="chunks",
+                data=chunk_records[start : start + sub_batch_size],
+            )
         logging.info(f"Inserted {len(chunk_records)} chunk records.")
 
-    def get_context(self, query: str, n_docs=2) -> List[Document]:
+    def get_context(
+        self, query: str, n_docs=2, n_results: Optional[int] = None
+    ) -> List[Document]:
         """
         Retrieves relevant documents from the database based on a query.
         Args:
             query (str): Input query.
+            n_docs (int): Number of parent documents to retrieve.
+            n_results (Optional[int]): Number of chunks to search for; defaults to
+                the search_limit config value. Kept below hnsw_ef so that the
+                configured ef, not the limit, sets the HNSW search breadth.
 
         Returns:
             List[Document]: List of relevant documents.
         """
-        n_results = 1000
+        n_results = n_results or Config.get("search_limit") or 50
         results = self._find_relevant_chunks(query, n_results)
         documents = self._retrieve_parent_documents(results, n_docs)
         context = self._create_context(documents)
@@ -507,23 +811,45 @@ class LongTermMemory:
             The context as a string, aggregated from relevant documents.
         """
 
-        # Generate dense embedding for the query
-        raw_query_dense_embeddings = self._dense_ef.encode_queries([query])
-        dense_query_embedding = [raw_query_dense_embeddings["dense"][0].tolist()]
+        with self._encode_lock:
+            # Generate dense embedding for the query (unless it is cached)
+            with torch.inference_mode():
+                query_dense_embeddings = self._embedding_cache.get_or_encode(
+                    f"{self._dense_model_key}|query",
+                    [query],
+                    lambda texts: [
+                        np.asarray(embedding, dtype=np.float16)
+                        for embedding in self._dense_ef.encode_queries(texts)["dense"]
+                    ],
+                )
+
+            # Generate sparse embedding for the query (unless it is cached)
+            query_sparse_rows = self._embedding_cache.get_or_encode(
+                f"{self._sparse_model_key}|query",
+                [query],
+                lambda texts: self._sparse_to_rows(
+                    self._sparse_ef.encode_queries(texts)
+                ),
+            )
 
-        # Generate sparse embedding for the query
-        raw_query_sparse_embeddings = self._sparse_ef.encode_queries(
-            [query]
-        )  # Returns a csr_matrix
+            extracted_entities = self.ner_extractor.extract_entities(query)
+
+        dense_query_embedding = [
+            np.asarray(query_dense_embeddings[0], dtype=np.float16)
+        ]
 
-        # Convert sparse embedding from csr_matrix format to a list for insertion
-        sparse_query_embedding = raw_query_sparse_embeddings.toarray().tolist()
+        # Convert sparse embedding from (indices, values) rows to {index: value} dicts
+        sparse_query_embedding = self._sparse_to_dicts(query_sparse_rows)
 
         # AnnSearchRequest for dense embeddings
         dense_search_request = AnnSearchRequest(
             data=dense_query_embedding,
             anns_field="dense_vector",
-            param={"metric_type": "IP", "params": {"nprobe": 1000}},
+            # HNSW needs ef >= limit
+            param={
+                "metric_type": "IP",
+                "params": {"ef": max(Config.get("hnsw_ef") or 64, n_results)},
+            },
             limit=n_results,
         )
 
@@ -531,11 +857,16 @@ class LongTermMemory:
         sparse_search_request = AnnSearchRequest(
             data=sparse_query_embedding,
             anns_field="sparse_vector",
-            param={"metric_type": "IP", "params": {"nprobe": 1000}},
+            param={"metric_type": "IP", "params": {"drop_ratio_search": 0.0}},
             limit=n_results,
         )
 
-        extracted_entities = self.ner_extractor.extract_entities(query)
+        # Both searches share the same requests and ranker
+        search_requests = [dense_search_request, sparse_search_request]
+        ranker = WeightedRanker(self.DENSE_SEARCH_WEIGHT, self.SPARSE_SEARCH_WEIGHT)
+
+        response = None
+        # Perform Hybrid Search
         if extracted_entities:
             # Construct the JSON array for JSON_CONTAINS_ANY
             entity_list = [
@@ -547,41 +878,34 @@ class LongTermMemory:
             # Construct the filter using JSON_CONTAINS_ANY
             dynamic_filter = f"JSON_CONTAINS_ANY(entities, {entity_list_json})"
 
-        response = None
-        # Perform Hybrid Search
-        if extracted_entities:
             response = self._chunks.hybrid_search(
-                reqs=[
-                    dense_search_request,
-                    sparse_search_request,
-                ],
-                rerank=WeightedRanker(
-                    self.DENSE_SEARCH_WEIGHT, self.SPARSE_SEARCH_WEIGHT
-                ),
+                reqs=search_requests,
+                rerank=ranker,
                 output_fields=["parent_id", "entities"],
                 limit=n_results,
                 filter=dynamic_filter,
             )
 
-            # Filter the response to only include chunks with the extracted entities
-            hits = []
-            for hit in response[0]:
-                entities = hit.entity.get("entities")
-                if any(ent in entities for ent in entity_list):
-                    hits.append(hit)
-            if hits:
-                response[0] = hits
+            # JSON_CONTAINS_ANY already filters by entity; optionally re-check each
+            # hit against the extracted (type, value) pairs with set lookups
+            if Config.get("postfilter_entities"):
+                wanted = set(extracted_entities)
+                hits = [
+                    hit
+                    for hit in response[0]
+                    if any(
+                        (ent["type"], ent["value"]) in wanted
+                        for ent in hit.entity.get("entities")
+                    )
+                ]
+                if hits:
+                    response[0] = hits
 
         # If no entities were extracted or no relevant chunks were found, perform a general search
         if not extracted_entities or not len(response):
             response = self._chunks.hybrid_search(
-                reqs=[
-                    dense_search_request,
-                    sparse_search_request,
-                ],
-                rerank=WeightedRanker(
-                    self.DENSE_SEARCH_WEIGHT, self.SPARSE_SEARCH_WEIGHT
-                ),
+                reqs=search_requests,
+                rerank=ranker,
                 output_fields=["parent_id"],
                 limit=n_results,
             )
@@ -590,18 +914,17 @@ class LongTermMemory:
     def _retrieve_parent_documents(
         self, response: SearchResult, n_docs: int
     ) -> List[Document]:
-        # Retrieve n_docs unique parent IDs from the response
-        unique_parent_ids = []
+        # Retrieve n_docs unique parent IDs from the response; a dict keeps the
+        # order of first appearance with constant-time membership checks
+        seen_parent_ids = {}
         for hit in response:
-            parent_id = hit.entity.get("parent_id")
-            if parent_id not in unique_parent_ids:
-                unique_parent_ids.append(parent_id)
-                if len(unique_parent_ids) == n_docs:
-                    break
-
-        documents = [
-            self._get_document_by_id(parent_id) for parent_id in unique_parent_ids
-        ]
+            seen_parent_ids.setdefault(hit.entity.get("parent_id"), None)
+            if len(seen_parent_ids) == n_docs:
+                break
+        unique_parent_ids = list(seen_parent_ids)
+
+        # Fetch all parent documents in a single round-trip
+        documents = self._get_documents_by_ids(unique_parent_ids)
 
         return documents
 
@@ -634,17 +957,36 @@ class LongTermMemory:
         Returns:
             Optional[Document]: Document associated with the given ID, or None if not found.
         """
+        return self._get_documents_by_ids([data_id])[0]
+
+    def _get_documents_by_ids(self, data_ids: List[str]) -> List[Optional[Document]]:
+        """
+        Gets several documents from the Milvus 'docs' collection with a single request.
+
+        Args:
+            data_ids (List[str]): Unique IDs associated with the documents.
+
+        Returns:
+            List[Optional[Document]]: The document for each ID, in the same order,
+            with None for IDs that were not found.
+        """
+        if not data_ids:
+            return []
+
         try:
             res = self._client.get(
                 collection_name="docs",
-                ids=[data_id],  # Milvus expects a list of IDs
+                ids=data_ids,  # Milvus expects a list of IDs
             )
+        except Exception as e:
+            logging.error(
+                f"An error occurred while retrieving document IDs {data_ids}: {e}"
+            )
+            return [None] * len(data_ids)
 
-            if not res:
-                logging.info(f"Document with ID {data_id} not found")
-                return None
-
-            fields = res[0]  # Extract the fields of the result
+        # Milvus does not guarantee the order of the results, so map them by ID
+        documents_by_id = {}
+        for fields in res:
             # Create a new metadata dictionary that includes everything except 'id' and 'text'
             metadata = {
                 key: value
@@ -652,16 +994,14 @@ class LongTermMemory:
                 if key not in ["id", "text", "docs_vector"]
             }
 
-            document = Document(
+            documents_by_id[fields["id"]] = Document(
                 id=fields["id"],
                 text=fields.get("text", ""),
                 metadata=metadata,  # Pass the new metadata dictionary
             )
 
-            return document
+        for data_id in data_ids:
+            if data_id not in documents_by_id:
+                logging.info(f"Document with ID {data_id} not found")
 
-        except Exception as e:
-            logging.error(
-                f"An error occurred while retrieving document ID {data_id}: {e}"
-            )
-            return None
+        return [documents_by_id.get(data_id) for data_id in data_ids]
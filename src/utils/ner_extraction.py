@@ -130,8 +130,38 @@ class EntityExtractor:
         """
 
         # Process the text with spaCy
-        doc = self.nlp(text)
+        return self._entities_from_doc(self.nlp(text))
 
+    def extract_entities_batch(
+        self, texts: List[str], batch_size: int = 64, n_process: int = 1
+    ) -> List[List[Tuple[str, str]]]:
+        """
+        Extract entities from several texts, running them through spaCy in batches.
+
+        Args:
+            texts (List[str]): The input texts to extract entities from.
+            batch_size (int): Number of texts spaCy processes per batch.
+            n_process (int): Number of spaCy worker processes; must be 1 when called
+                from a daemonic process (such as a ProcessPoolExecutor worker).
+
+        Returns:
+            List[List[Tuple[str, str]]]: The extracted entities of each text, in order.
+        """
+        return [
+            self._entities_from_doc(doc)
+            for doc in self.nlp.pipe(texts, batch_size=batch_size, n_process=n_process)
+        ]
+
+    def _entities_from_doc(self, doc) -> List[Tuple[str, str]]:
+        """
+        Extract entities from a document already processed by spaCy.
+
+        Args:
+            doc (spacy.tokens.Doc): The processed document.
+
+        Returns:
+            List[Tuple[str, str]]: A list of extracted entities, each represented as a tuple of (entity_type, entity_text).
+        """
         # Extract "ID" entities using regex patterns and mark them for removal
         id_entities = []
         for pattern in self.id_patterns:
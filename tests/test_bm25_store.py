@@ -0,0 +1,109 @@
+import pickle
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+pytest.importorskip("bm25s")
+pytest.importorskip("milvus_model.sparse")
+
+from milvus_model.sparse import BM25EmbeddingFunction
+
+from src.memory.bm25_store import load_bm25_model, save_bm25_model
+from src.memory.bm25s_embedding import BM25SEmbeddingFunction
+
+LEGACY_MODEL_PATH = Path(__file__).parents[1] / "models" / "bm25_model.pkl"
+
+CORPUS = [
+    "el decreto regula la ley de aguas",
+    "la ley de costas y el decreto de puertos",
+    "decreto sobre ayudas a la vivienda",
+]
+QUERIES = ["decreto de aguas", "ley de vivienda desconocida"]
+
+
+def analyzer(text):
+    return text.lower().split()
+
+
+def assert_same_encodings(expected_ef, actual_ef, texts):
+    np.testing.assert_allclose(
+        actual_ef.encode_documents(texts).toarray(),
+        expected_ef.encode_documents(texts).toarray(),
+        rtol=1e-6,
+    )
+    np.testing.assert_allclose(
+        actual_ef.encode_queries(texts).toarray(),
+        expected_ef.encode_queries(texts).toarray(),
+        rtol=1e-6,
+    )
+
+
+@pytest.mark.parametrize(
+    "make_ef",
+    [
+        lambda: BM25SEmbeddingFunction(analyzer, k1=1.2, b=0.6),
+        lambda: BM25EmbeddingFunction(analyzer, k1=1.2, b=0.6, num_workers=1),
+    ],
+    ids=["bm25s", "milvus"],
+)
+def test_round_trip(tmp_path, make_ef):
+    bm25_ef = make_ef()
+    bm25_ef.fit(CORPUS)
+    base_path = str(tmp_path / "bm25_model")
+
+    save_bm25_model(bm25_ef, base_path)
+    loaded_ef = load_bm25_model(base_path, analyzer)
+
+    assert type(loaded_ef) is type(bm25_ef)
+    assert (loaded_ef.k1, loaded_ef.b) == (bm25_ef.k1, bm25_ef.b)
+    assert loaded_ef.corpus_size == bm25_ef.corpus_size
+    assert loaded_ef.avgdl == pytest.approx(bm25_ef.avgdl)
+    assert_same_encodings(bm25_ef, loaded_ef, CORPUS + QUERIES)
+
+
+def test_migrates_legacy_pickle(tmp_path):
+    with open(LEGACY_MODEL_PATH, "rb") as file:
+        legacy_ef = pickle.load(file)
+    base_path = str(tmp_path / "bm25_model")
+
+    save_bm25_model(legacy_ef, base_path)
+    loaded_ef = load_bm25_model(base_path, analyzer)
+
+    assert loaded_ef.idf == legacy_ef.idf
+    assert loaded_ef.corpus_size == legacy_ef.corpus_size
+    assert loaded_ef.avgdl == legacy_ef.avgdl
+    assert loaded_ef.epsilon == legacy_ef.epsilon
+
+    # The pickled analyzer needs NLTK data; compare the vectors on plain words
+    legacy_ef.analyzer = analyzer
+    texts = [" ".join(list(legacy_ef.idf)[:50]), " ".join(list(legacy_ef.idf)[-5:])]
+    assert_same_encodings(legacy_ef, loaded_ef, texts)
+
+
+@pytest.mark.parametrize("saved, loaded", [("milvus", "bm25s"), ("bm25s", "milvus")])
+def test_load_into_other_backend(tmp_path, saved, loaded):
+    backends = {"bm25s": BM25SEmbeddingFunction, "milvus": BM25EmbeddingFunction}
+    bm25_ef = backends[saved](analyzer)
+    bm25_ef.fit(CORPUS)
+    base_path = str(tmp_path / "bm25_model")
+
+    save_bm25_model(bm25_ef, base_path)
+    loaded_ef = load_bm25_model(base_path, analyzer, backend=loaded)
+
+    assert type(loaded_ef) is backends[loaded]
+    assert_same_encodings(bm25_ef, loaded_ef, CORPUS + QUERIES)
+
+
+def test_legacy_pickle_loads_into_bm25s(tmp_path):
+    with open(LEGACY_MODEL_PATH, "rb") as file:
+        legacy_ef = pickle.load(file)
+    legacy_ef.analyzer = analyzer
+    base_path = str(tmp_path / "bm25_model")
+
+    save_bm25_model(legacy_ef, base_path)
+    loaded_ef = load_bm25_model(base_path, analyzer, backend="bm25s")
+
+    assert isinstance(loaded_ef, BM25SEmbeddingFunction)
+    texts = [" ".join(list(legacy_ef.idf)[:50]), " ".join(list(legacy_ef.idf)[-5:])]
+    assert_same_encodings(legacy_ef, loaded_ef, texts)
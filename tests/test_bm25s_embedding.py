@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("bm25s")
+
+from src.memory.bm25s_embedding import BM25SEmbeddingFunction
+
+CORPUS = [
+    "el decreto regula la ley de aguas",
+    "la ley de costas y el decreto de puertos de la costa",
+    "decreto sobre ayudas a la vivienda",
+    "ayudas ayudas ayudas",
+]
+
+
+def analyzer(text):
+    return text.lower().split()
+
+
+def test_fit_statistics():
+    bm25_ef = BM25SEmbeddingFunction(analyzer)
+    bm25_ef.fit(CORPUS)
+
+    assert bm25_ef.corpus_size == len(CORPUS)
+    assert bm25_ef.avgdl == pytest.approx(
+        sum(len(analyzer(text)) for text in CORPUS) / len(CORPUS)
+    )
+    assert bm25_ef.dim == len({term for text in CORPUS for term in analyzer(text)})
+
+    # Lucene IDF: "decreto" appears in 3 of the 4 documents
+    expected_idf = np.log(1 + (4 - 3 + 0.5) / (3 + 0.5))
+    assert bm25_ef.idf[bm25_ef.vocab["decreto"]] == pytest.approx(expected_idf)
+
+
+def test_queries_drop_unknown_terms():
+    bm25_ef = BM25SEmbeddingFunction(analyzer)
+    bm25_ef.fit(CORPUS)
+
+    query_vectors = bm25_ef.encode_queries(["ayudas desconocida", "desconocida"])
+
+    assert query_vectors.shape == (2, bm25_ef.dim)
+    assert query_vectors[[0], :].nnz == 1
+    assert query_vectors[[1], :].nnz == 0
+
+
+def test_matches_milvus_bm25():
+    sparse = pytest.importorskip("milvus_model.sparse")
+    milvus_ef = sparse.BM25EmbeddingFunction(analyzer, num_workers=1)
+    milvus_ef.fit(CORPUS)
+    bm25_ef = BM25SEmbeddingFunction(analyzer)
+    bm25_ef.fit(CORPUS)
+
+    # Both number terms in order of first appearance, so the columns line up
+    assert {term: index for term, (_, index) in milvus_ef.idf.items()} == bm25_ef.vocab
+    np.testing.assert_allclose(
+        bm25_ef.encode_documents(CORPUS).toarray(),
+        milvus_ef.encode_documents(CORPUS).toarray(),
+        rtol=1e-6,
+    )
@@ -0,0 +1,68 @@
+import pytest
+
+pytest.importorskip("diskcache")
+pytest.importorskip("blake3")
+
+from src.memory.embedding_cache import EmbeddingCache
+
+
+class FakeEncoder:
+    # Records every call; each text is "encoded" as its upper-cased form
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, texts):
+        self.calls.append(list(texts))
+        return [text.upper() for text in texts]
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return EmbeddingCache(str(tmp_path / "cache"))
+
+
+def test_misses_are_encoded_in_one_call(cache):
+    encode = FakeEncoder()
+
+    values = cache.get_or_encode("model", ["uno", "dos"], encode)
+
+    assert values == ["UNO", "DOS"]
+    assert encode.calls == [["uno", "dos"]]
+
+
+def test_hits_and_misses_keep_input_order(cache):
+    cache.get_or_encode("model", ["dos", "cuatro"], FakeEncoder())
+    encode = FakeEncoder()
+
+    values = cache.get_or_encode("model", ["uno", "dos", "tres", "cuatro"], encode)
+
+    assert values == ["UNO", "DOS", "TRES", "CUATRO"]
+    assert encode.calls == [["uno", "tres"]]
+
+
+def test_all_hits_skip_the_encoder(cache):
+    cache.get_or_encode("model", ["uno", "dos"], FakeEncoder())
+    encode = FakeEncoder()
+
+    assert cache.get_or_encode("model", ["dos", "uno"], encode) == ["DOS", "UNO"]
+    assert encode.calls == []
+
+
+def test_keys_normalize_whitespace_and_separate_models(cache):
+    cache.get_or_encode("model", ["uno  dos"], FakeEncoder())
+    encode = FakeEncoder()
+
+    assert cache.get_or_encode("model", [" uno\ndos "], encode) == ["UNO  DOS"]
+    assert encode.calls == []
+
+    cache.get_or_encode("other", ["uno dos"], encode)
+    assert encode.calls == [["uno dos"]]
+
+
+def test_entries_persist_across_instances(tmp_path):
+    path = str(tmp_path / "cache")
+    EmbeddingCache(path).get_or_encode("model", ["uno"], FakeEncoder())
+    encode = FakeEncoder()
+
+    assert EmbeddingCache(path).get_or_encode("model", ["uno"], encode) == ["UNO"]
+    assert encode.calls == []
@@ -0,0 +1,188 @@
+import asyncio
+import json
+import shelve
+from unittest.mock import Mock
+
+import pandas as pd
+import pytest
+
+pytest.importorskip("openai")
+pytest.importorskip("fitz")
+
+from openai import RateLimitError
+from tenacity import wait_none
+
+from evals.evaluator import Evaluator
+from evals.rate_limiter import RateLimitedClient
+
+PAGES = [f"pagina {i} " * 20 for i in range(10)]
+
+
+class FakeEncoding:
+    def encode(self, text):
+        return text.split()
+
+    def decode(self, tokens):
+        return " ".join(tokens)
+
+
+class FakeClient:
+    # Answers each INPUT[i] of a packed request with a triplet quoting it (or a
+    # passing score); packs whose size is in short_packs get one item too few
+    def __init__(self, short_packs=(), error=None):
+        self.short_packs = set(short_packs)
+        self.error = error
+        self.pack_sizes = []
+
+    async def create(self, **kwargs):
+        inputs = [
+            text.split(": ", 1)[1]
+            for text in kwargs["messages"][1]["content"].split("\n\n")
+        ]
+        self.pack_sizes.append(len(inputs))
+        if self.error is not None:
+            raise self.error
+        if len(inputs) in self.short_packs:
+            inputs = inputs[:-1]
+
+        if kwargs["response_format"]["json_schema"]["name"] == "evaluation_response":
+            items = [{"has_context": 1, "is_correct": 1} for _ in inputs]
+        else:
+            items = [
+                {"context": text, "question": "q", "answer": "a"} for text in inputs
+            ]
+        message = Mock(content=json.dumps({"items": items}))
+        return Mock(choices=[Mock(message=message, finish_reason="stop")])
+
+
+@pytest.fixture
+def evaluator(tmp_path, monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    monkeypatch.setattr(
+        RateLimitedClient, "encoding_for", lambda self, model: FakeEncoding()
+    )
+    # No backoff between retries
+    for method in (
+        Evaluator.generate_context_question_answer,
+        Evaluator._evaluate_pack,
+    ):
+        monkeypatch.setattr(method.retry, "wait", wait_none())
+
+    evaluator = Evaluator(items_per_request=4, cache_path=str(tmp_path / "cache.db"))
+    evaluator.limited_client = FakeClient()
+    return evaluator
+
+
+def generate(evaluator, pages=PAGES):
+    return asyncio.run(evaluator._generate_triplets(pages))
+
+
+def test_results_follow_input_order_and_are_cached(evaluator):
+    triplets, skipped = generate(evaluator)
+
+    assert [triplet["context"] for triplet in triplets] == PAGES
+    assert skipped == []
+    assert sorted(evaluator.limited_client.pack_sizes) == [2, 4, 4]
+
+    # A re-run is served from the cache
+    evaluator.limited_client = FakeClient()
+    assert generate(evaluator) == (triplets, [])
+    assert evaluator.limited_client.pack_sizes == []
+
+
+def test_wrong_count_pack_is_split(evaluator):
+    evaluator.limited_client = FakeClient(short_packs={4})
+
+    triplets, skipped = generate(evaluator)
+
+    assert [triplet["context"] for triplet in triplets] == PAGES
+    assert skipped == []
+    # Both full packs exhaust their retries before being re-sent in halves
+    assert evaluator.limited_client.pack_sizes.count(4) == 2 * 5
+    assert evaluator.limited_client.pack_sizes.count(2) == 1 + 4
+
+
+def test_input_skipped_after_repeated_malformed_answers(evaluator):
+    evaluator.limited_client = FakeClient(short_packs={4, 2, 1})
+
+    triplets, skipped = generate(evaluator, PAGES[:4])
+
+    assert triplets == []
+    assert skipped == PAGES[:4]
+    with shelve.open(evaluator.cache_path) as cache:
+        assert len(cache) == 0
+
+
+def test_api_errors_are_raised_after_retries(evaluator):
+    error = RateLimitError("quota", response=Mock(status_code=429), body=None)
+    evaluator.limited_client = FakeClient(error=error)
+
+    with pytest.raises(RateLimitError):
+        generate(evaluator)
+
+    # Each pack is retried, never split or skipped
+    assert sorted(evaluator.limited_client.pack_sizes) == [2] * 5 + [4] * 10
+
+
+def test_dropped_pages_are_reported_and_not_saved(evaluator, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(evaluator, "iter_pages", lambda: iter(PAGES[:4]))
+    evaluator.limited_client = FakeClient(short_packs={4, 2, 1})
+    evaluator.chatbot = Mock()
+
+    summary = asyncio.run(evaluator._generate_and_evaluate("triplets.xlsx"))
+
+    assert summary["Total Responses"] == 0
+    assert summary["Total Skipped"] == 4
+    assert not (tmp_path / "triplets.xlsx").exists()
+
+
+def test_evaluates_triplets_with_empty_cells_and_lists_skipped(
+    evaluator, tmp_path, monkeypatch
+):
+    pytest.importorskip("openpyxl")
+    monkeypatch.chdir(tmp_path)
+    triplets = [
+        {"context": f"contexto {i}", "question": f"pregunta {i}", "answer": ""}
+        for i in range(3)
+    ]
+    evaluator.save_triplets(triplets, "triplets.xlsx")
+    evaluator.chatbot = Mock(respond_w_context=lambda question: f"sobre {question}")
+    # The pack of 3 is split; the single-item half keeps failing and is skipped
+    evaluator.limited_client = FakeClient(short_packs={3, 1})
+
+    summary = evaluator.evaluate_existing_triplets("triplets.xlsx")
+
+    assert summary["Total Responses"] == 2
+    assert summary["Total Correct"] == 2
+    assert summary["Total Skipped"] == 1
+    details = pd.read_excel("evaluation_summary.xlsx", sheet_name="Detailed Responses")
+    assert sorted(details["GPT Question"]) == ["pregunta 0", "pregunta 1", "pregunta 2"]
+    assert details["Is Correct"].isna().sum() == 1
+
+
+def test_parse_items_rejects_truncated_and_wrong_count(evaluator):
+    content = json.dumps({"items": [{"has_context": 1, "is_correct": 1}] * 2})
+
+    assert len(evaluator._parse_items(content, 2, "stop")) == 2
+    with pytest.raises(ValueError, match="truncated"):
+        evaluator._parse_items(content[:-5], 2, "length")
+    with pytest.raises(ValueError, match="Expected 3 items"):
+        evaluator._parse_items(content, 3)
+    with pytest.raises(json.JSONDecodeError):
+        evaluator._parse_items(content[:-5], 2)
+
+
+def test_completion_budget_scales_with_pack_size(evaluator):
+    assert evaluator._cqa_request(PAGES[:1])["max_tokens"] == 1536
+    assert evaluator._cqa_request(PAGES[:4])["max_tokens"] == 4 * 1536
+    assert evaluator._cqa_max_tokens(20) == 16384
+
+
+def test_long_pages_are_split_to_fit_a_full_pack(evaluator):
+    budget = (128000 - evaluator._cqa_max_tokens(4) - 1024) // 4
+    page = " ".join(f"w{i}" for i in range(2 * budget + 10))
+
+    pieces = list(evaluator._split_page(page))
+
+    assert [len(piece.split()) for piece in pieces] == [budget, budget, 10]
@@ -0,0 +1,68 @@
+import asyncio
+from unittest.mock import Mock
+
+import pytest
+
+pytest.importorskip("torch")
+pytest.importorskip("pymilvus")
+pytest.importorskip("milvus_model")
+
+from config.config import Config
+from src.memory.long_term_memory import LongTermMemory
+
+DENSE_DIM = 1024
+
+
+class FakeAsyncClient:
+    def __init__(self):
+        self.inserts = []
+
+    async def insert(self, collection_name, data):
+        self.inserts.append((collection_name, list(data)))
+
+
+def make_memory():
+    # Skips __init__, which connects to Milvus and loads the embedding models
+    memory = LongTermMemory.__new__(LongTermMemory)
+    memory._dense_ef = Mock(dim={"dense": DENSE_DIM})
+    return memory
+
+
+def make_records(n, nnz=10, text="x" * 100):
+    return [
+        {"id": i, "text": text, "sparse_vector": {j: 1.0 for j in range(nnz)}}
+        for i in range(n)
+    ]
+
+
+def insert(records, max_insert_bytes):
+    client = FakeAsyncClient()
+    config = {"max_insert_bytes": max_insert_bytes}
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setattr(Config, "get", lambda key: config.get(key))
+        asyncio.run(make_memory()._insert_chunk_records(client, records))
+    return client.inserts
+
+
+def test_inserts_are_split_by_estimated_size():
+    # 2 bytes per dense dimension, 8 per sparse entry, the text and 256 overhead
+    record_bytes = DENSE_DIM * 2 + 10 * 8 + 100 + 256
+    records = make_records(10)
+
+    inserts = insert(records, max_insert_bytes=4 * record_bytes + 1)
+
+    assert [len(data) for _, data in inserts] == [4, 4, 2]
+    assert {name for name, _ in inserts} == {"chunks"}
+    assert [record for _, data in inserts for record in data] == records
+
+
+def test_oversized_records_are_inserted_one_by_one():
+    records = make_records(3, nnz=1000, text="x" * 10000)
+
+    inserts = insert(records, max_insert_bytes=1000)
+
+    assert [len(data) for _, data in inserts] == [1, 1, 1]
+
+
+def test_empty_batches_are_not_sent():
+    assert insert([], max_insert_bytes=1000) == []
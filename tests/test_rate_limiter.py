@@ -0,0 +1,134 @@
+import asyncio
+from unittest.mock import Mock
+
+import pytest
+
+pytest.importorskip("tiktoken")
+
+from evals import rate_limiter
+from evals.rate_limiter import RateLimitedClient, TokenBucket
+
+
+class FakeClock:
+    # Stands in for time.monotonic and asyncio.sleep: sleeping advances the clock
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    async def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(rate_limiter.time, "monotonic", clock.monotonic)
+    monkeypatch.setattr(rate_limiter.asyncio, "sleep", clock.sleep)
+    return clock
+
+
+def test_acquire_takes_available_tokens(clock):
+    bucket = TokenBucket(60)
+
+    asyncio.run(bucket.acquire(40))
+
+    assert bucket.tokens == 20
+    assert clock.sleeps == []
+
+
+def test_acquire_waits_for_refill(clock):
+    bucket = TokenBucket(60)
+
+    asyncio.run(bucket.acquire(60))
+    asyncio.run(bucket.acquire(30))
+
+    # 60 tokens per minute refill at one per second
+    assert clock.sleeps == [pytest.approx(30)]
+    assert bucket.tokens == pytest.approx(0)
+
+
+def test_acquire_refills_over_time(clock):
+    bucket = TokenBucket(60)
+    asyncio.run(bucket.acquire(60))
+
+    clock.now += 90
+    asyncio.run(bucket.acquire(50))
+
+    # The refill is capped at capacity
+    assert clock.sleeps == []
+    assert bucket.tokens == pytest.approx(10)
+
+
+def test_acquire_caps_amount_at_capacity(clock):
+    bucket = TokenBucket(60)
+
+    asyncio.run(bucket.acquire(1000))
+
+    assert clock.sleeps == []
+    assert bucket.tokens == 0
+
+
+def test_retune_updates_capacity_and_remaining(clock):
+    bucket = TokenBucket(60)
+
+    bucket.retune(limit=120, remaining=25)
+
+    assert bucket.capacity == 120
+    assert bucket.tokens == 25
+
+
+def test_retune_never_raises_tokens(clock):
+    bucket = TokenBucket(60)
+    asyncio.run(bucket.acquire(50))
+
+    bucket.retune(remaining=40)
+    assert bucket.tokens == pytest.approx(10)
+
+    bucket.retune()
+    assert (bucket.capacity, bucket.tokens) == (60, pytest.approx(10))
+
+
+class FakeEncoding:
+    def encode(self, text):
+        return text.split()
+
+
+class FakeCompletions:
+    # Plays both chat.completions and its with_raw_response wrapper
+    def __init__(self, headers):
+        self.with_raw_response = self
+        self.headers = headers
+
+    async def create(self, **kwargs):
+        return Mock(headers=self.headers, parse=lambda: "parsed")
+
+
+def test_create_charges_estimate_and_retunes_from_headers(clock, monkeypatch):
+    monkeypatch.setattr(
+        RateLimitedClient, "encoding_for", lambda self, model: FakeEncoding()
+    )
+    headers = {
+        "x-ratelimit-limit-requests": "200",
+        "x-ratelimit-remaining-requests": "50",
+        "x-ratelimit-limit-tokens": "2000",
+        "x-ratelimit-remaining-tokens": "900",
+    }
+    client = Mock()
+    client.chat.completions = FakeCompletions(headers)
+    limited = RateLimitedClient(client, requests_per_minute=100, tokens_per_minute=1000)
+    messages = [{"role": "user", "content": "uno dos tres"}]
+
+    response = asyncio.run(
+        limited.create(model="gpt-4o", messages=messages, max_tokens=100)
+    )
+
+    assert response == "parsed"
+    # 3 prompt tokens, 4 per message and the whole max_tokens are charged
+    assert limited.tpm_bucket.tokens == 1000 - 107
+    assert limited.tpm_bucket.capacity == 2000
+    assert limited.rpm_bucket.tokens == 50
+    assert limited.rpm_bucket.capacity == 200